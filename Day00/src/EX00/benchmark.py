@@ -0,0 +1,72 @@
+import io
+import os
+import random
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from time import time
+
+import blocks
+
+
+def generate_hashes(number_of_lines: int, seed: int = 21) -> bytes:
+    rand = random.Random(seed)
+    lines: list[str] = []
+    for _ in range(number_of_lines):
+        hash: str = "%032x" % rand.getrandbits(128)
+        if rand.random() < 0.1:
+            hash = "00000" + hash[5:]
+        lines.append(hash)
+    return ("\n".join(lines) + "\n").encode()
+
+
+def bench_check(data: bytes) -> float:
+    start = time()
+    hashes: list[str] = [line.strip() for line in data.decode().splitlines()]
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        blocks.check(hashes)
+    return time() - start
+
+
+def bench_check_iter(data: bytes) -> float:
+    start = time()
+    with open(os.devnull, "wb") as devnull:
+        blocks.write_matches(blocks.check_iter(io.BytesIO(data)), devnull)
+    return time() - start
+
+
+def bench_check_mmap(data: bytes) -> float:
+    with tempfile.NamedTemporaryFile(suffix=".txt") as file:
+        file.write(data)
+        file.flush()
+        start = time()
+        with open(os.devnull, "wb") as devnull:
+            blocks.write_matches(blocks.check_mmap(file.name), devnull)
+        return time() - start
+
+
+def bench_check_parallel(data: bytes, workers: int) -> float:
+    with tempfile.NamedTemporaryFile(suffix=".txt") as file:
+        file.write(data)
+        file.flush()
+        start = time()
+        with open(os.devnull, "wb") as devnull:
+            blocks.write_matches(blocks.check_parallel(file.name, workers), devnull)
+        return time() - start
+
+
+if __name__ == "__main__":
+    number_of_lines: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    data: bytes = generate_hashes(number_of_lines)
+    time_check = bench_check(data)
+    time_iter = bench_check_iter(data)
+    time_mmap = bench_check_mmap(data)
+    print(f"check():      {number_of_lines / time_check:>14,.0f} lines/s")
+    print(f"check_iter(): {number_of_lines / time_iter:>14,.0f} lines/s")
+    print(f"check_mmap(): {number_of_lines / time_mmap:>14,.0f} lines/s")
+    print(f"=> check_iter() faster than check() in {time_check / time_iter:.1f} times")
+    workers: int = 1
+    while workers <= (os.cpu_count() or 1) * 2:
+        time_parallel = bench_check_parallel(data, workers)
+        print(f"--workers {workers:<3} {number_of_lines / time_parallel:>14,.0f} lines/s")
+        workers *= 2
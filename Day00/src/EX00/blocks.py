@@ -1,5 +1,21 @@
+import io
+import os
 import sys
+import re
+import tempfile
+import mmap
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterable, Iterator
+
+
+HASH_LENGTH: int = 32
+HASH_PREFIX: str = "00000"
+CHUNK_SIZE: int = 1 << 20
+BATCH_SIZE: int = 4096
+# only a prefilter: the pattern is a literal, so re jumps between the lines
+# which contain the prefix, every candidate line is confirmed by is_valid_hash()
+HASH_PATTERN: re.Pattern[bytes] = re.compile(re.escape(HASH_PREFIX.encode()))
 
 
 def test() -> None:
@@ -58,19 +74,206 @@ def test() -> None:
     print("Well done!!!")
 
 
+def test_iter() -> None:
+    lines: list[str] = [
+        "00000254b208c0f43409d8dc00439896",
+        "  0000085a34260d1c84e89865c210ceb4\r",
+        "000000434dd5469464f5cafd8ffe3609",
+        "00000f31eaabadef948f28d1",
+        "0000071f49cffeaea4184be3d507086v ",
+        "0000071f49cffeaea4184be3d507086v1",
+        "x00000254b208c0f43409d8dc00439896",
+        "",
+        "00000100000000000000000000000000",
+        "000008\u00e96d070c415e\u00e9d7\u00e9e7\u00e90cad1946",
+        "\x1c0000085a34260d1c84e89865c210ceb4\x1f",
+        "\u20030000085a34260d1c84e89865c210ceb4",
+        "00000\u00e9254b208c0f43409d8dc0043989",
+    ]
+    data: bytes = "\n".join(lines).encode()
+    expected: list[bytes] = [
+        line.strip().encode() for line in lines if is_valid_hash(line.strip())
+    ]
+    assert list(check_iter(io.BytesIO(data))) == expected
+    assert list(check_iter(io.BytesIO(data), chunk_size=7)) == expected
+    assert list(check_iter(io.BytesIO(data), number_of_lines=2)) == expected[:2]
+    assert list(check_iter(io.BytesIO(b""))) == []
+    with tempfile.NamedTemporaryFile(suffix=".txt") as file:
+        file.write((data + b"\n") * 100)
+        file.flush()
+        ranges: list[tuple[int, int]] = split_ranges(file.name, 7)
+        assert ranges[0][0] == 0 and ranges[-1][1] == (len(data) + 1) * 100
+        assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+        assert list(check_parallel(file.name, 3)) == expected * 100
+    print("Well done!!!")
+
+
+def is_valid_hash(hash: str) -> bool:
+    return (
+        len(hash) == HASH_LENGTH
+        and hash.startswith(HASH_PREFIX)
+        and hash[len(HASH_PREFIX)] != '0'
+    )
+
+
 def check(input_hashes: list[str]) -> list[str]:
     hashes: list[str] = [] # return this list for tests
     for hash in input_hashes:
-        if len(hash) == 32 and hash.startswith("00000") and hash[5] != '0':
+        if is_valid_hash(hash):
             # hashes.append(hash) # uncomment this line for tests
             print(hash)
     return hashes
 
 
+def read_chunks(
+        stream: BinaryIO,
+        chunk_size: int = CHUNK_SIZE,
+        number_of_lines: int | None = None) -> Iterator[bytes]:
+    """Read the stream by big buffers which always end on a line boundary"""
+    tail: bytes = b""
+    while number_of_lines is None or number_of_lines > 0:
+        chunk: bytes = stream.read(chunk_size)
+        if not chunk:
+            break
+        chunk = tail + chunk
+        last_newline: int = chunk.rfind(b"\n")
+        if last_newline == -1:
+            tail = chunk
+            continue
+        tail = chunk[last_newline + 1:]
+        chunk = chunk[:last_newline + 1]
+        if number_of_lines is not None:
+            lines_in_chunk: int = chunk.count(b"\n")
+            if lines_in_chunk >= number_of_lines:
+                yield chunk[:nth_newline(chunk, number_of_lines) + 1]
+                return
+            number_of_lines -= lines_in_chunk
+        yield chunk
+    if tail and (number_of_lines is None or number_of_lines > 0):
+        yield tail
+
+
+def nth_newline(chunk: bytes, n: int) -> int:
+    position: int = -1
+    for _ in range(n):
+        position = chunk.find(b"\n", position + 1)
+    return position
+
+
+def find_hashes(buffer: bytes | mmap.mmap, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """Lines of the buffer which check() accepts, the line is cut at the
+    newlines around a candidate, decoded and stripped as readline().strip()"""
+    end = len(buffer) if end is None else end
+    position: int = start
+    while match := HASH_PATTERN.search(buffer, position, end):
+        line_start: int = buffer.rfind(b"\n", start, match.start()) + 1 or start
+        line_end: int = buffer.find(b"\n", match.start(), end)
+        if line_end == -1:
+            line_end = end
+        position = line_end + 1
+        if line_end - line_start < HASH_LENGTH:
+            continue
+        line: str = buffer[line_start:line_end].decode(errors="surrogateescape").strip()
+        if is_valid_hash(line):
+            yield line.encode(errors="surrogateescape")
+
+
+def check_iter(
+        stream: BinaryIO,
+        chunk_size: int = CHUNK_SIZE,
+        number_of_lines: int | None = None) -> Iterator[bytes]:
+    """Yield the valid hashes from a binary stream without splitting it by lines"""
+    for chunk in read_chunks(stream, chunk_size, number_of_lines):
+        yield from find_hashes(chunk)
+
+
+def check_mmap(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from find_hashes(data)
+
+
+def split_ranges(path: str, parts: int) -> list[tuple[int, int]]:
+    """Split the file into byte ranges which start right after a newline"""
+    with open(path, "rb") as file:
+        size: int = os.fstat(file.fileno()).st_size
+        if not size:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            bounds: list[int] = [0]
+            for part in range(1, parts):
+                newline: int = data.find(b"\n", max(bounds[-1], size * part // parts))
+                if newline == -1:
+                    break
+                if newline + 1 > bounds[-1]:
+                    bounds.append(newline + 1)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def check_range(path: str, start: int, end: int) -> list[bytes]:
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return list(find_hashes(data, start, end))
+
+
+def check_parallel(path: str, workers: int) -> Iterator[bytes]:
+    ranges: list[tuple[int, int]] = split_ranges(path, workers * 4)
+    if not ranges:
+        return
+    starts, ends = zip(*ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for hashes in executor.map(check_range, [path] * len(ranges), starts, ends):
+            yield from hashes
+
+
+def write_matches(
+        hashes: Iterable[bytes],
+        output: BinaryIO,
+        batch_size: int = BATCH_SIZE) -> None:
+    batch: list[bytes] = []
+    for hash in hashes:
+        batch.append(hash)
+        if len(batch) == batch_size:
+            output.write(b"\n".join(batch) + b"\n")
+            batch.clear()
+    if batch:
+        output.write(b"\n".join(batch) + b"\n")
+    output.flush()
+
+
+def stream(args: argparse.Namespace) -> None:
+    output: BinaryIO = sys.stdout.buffer
+    if args.workers > 1:
+        write_matches(check_parallel(args.file, args.workers), output)
+    elif args.mmap:
+        write_matches(check_mmap(args.file), output)
+    elif args.file:
+        with open(args.file, "rb") as file:
+            write_matches(check_iter(file, number_of_lines=args.number_of_lines), output)
+    else:
+        write_matches(check_iter(sys.stdin.buffer, number_of_lines=args.number_of_lines), output)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("number_of_lines", help="Number of lines to be read", type=int)
+    parser.add_argument("number_of_lines", help="Number of lines to be read", type=int, nargs="?")
+    parser.add_argument("--stream", help="Read the input by big buffers until EOF", action="store_true")
+    parser.add_argument("--file", help="Read the hashes from the file instead of stdin")
+    parser.add_argument("--mmap", help="Memory-map the file given by --file", action="store_true")
+    parser.add_argument("--workers", help="Check the file given by --file in N processes", type=int, default=1)
     args = parser.parse_args()
+    if args.mmap and not args.file:
+        parser.error("--mmap requires --file")
+    if args.workers > 1 and not args.file:
+        parser.error("--workers requires --file")
+    if args.stream or args.file:
+        stream(args)
+        exit(0)
+    if args.number_of_lines is None:
+        parser.error("number_of_lines is required without --stream")
     hashes: list[str] = []
     try:
         for _ in range(args.number_of_lines):
@@ -81,3 +284,4 @@ if __name__ == "__main__":
         exit(-1)
 
     # test()
+    # test_iter()
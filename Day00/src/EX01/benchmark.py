@@ -0,0 +1,42 @@
+import random
+import string
+import sys
+from time import time
+
+import decypher
+
+
+def generate_messages(number_of_messages: int, seed: int = 21) -> list[str]:
+    rand = random.Random(seed)
+    words: list[str] = [
+        "".join(rand.choices(string.ascii_letters, k=rand.randint(1, 10)))
+        for _ in range(1000)
+    ]
+    return [
+        " ".join(rand.choices(words, k=rand.randint(3, 15))) + "\n"
+        for _ in range(number_of_messages)
+    ]
+
+
+if __name__ == "__main__":
+    number_of_messages: int = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    messages: list[str] = generate_messages(number_of_messages)
+
+    start = time()
+    res_old = [decypher.decypher(message) for message in messages]
+    time_old = time() - start
+
+    start = time()
+    res_batch = list(decypher.decypher_batch(messages))
+    time_batch = time() - start
+
+    start = time()
+    res_pool = list(decypher.decypher_batch(messages, workers=4))
+    time_pool = time() - start
+
+    assert res_old == res_batch == res_pool
+
+    print(f"decypher():                  {number_of_messages / time_old:>12,.0f} messages/s")
+    print(f"decypher_batch():            {number_of_messages / time_batch:>12,.0f} messages/s")
+    print(f"decypher_batch(workers=4):   {number_of_messages / time_pool:>12,.0f} messages/s")
+    print(f"=> decypher_batch() faster than decypher() in {time_old / time_batch:.1f} times")
@@ -1,11 +1,73 @@
 import sys
 import argparse
+from itertools import islice
+from multiprocessing import Pool
+from operator import itemgetter
+from typing import Iterable, Iterator, TextIO
+
+
+BATCH_SIZE: int = 4096
+first_letter = itemgetter(0)
+
+
+class LowerTable(dict):
+    """Translate table for str.translate() which lowers every symbol on its own,
+    exactly like word[0].lower() does, and remembers it for the next time"""
+    def __missing__(self, code: int) -> str:
+        self[code] = letter = chr(code).lower()
+        return letter
+
+
+LOWER_TABLE: LowerTable = LowerTable()
 
 
 def decypher(message: str) -> str:
     return "".join(word[0].lower() for word in message.split())
 
 
+def decypher_chunk(messages: list[str]) -> list[str]:
+    # the first letters never contain a newline, so the whole chunk
+    # is lowered by one translate() call and split back
+    return "\n".join([
+        "".join(map(first_letter, message.split())) for message in messages
+    ]).translate(LOWER_TABLE).split("\n")
+
+
+def batches(messages: Iterable[str], batch_size: int) -> Iterator[list[str]]:
+    iterator: Iterator[str] = iter(messages)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def decypher_batch(
+        messages: Iterable[str],
+        batch_size: int = BATCH_SIZE,
+        workers: int = 1) -> Iterator[str]:
+    if workers > 1:
+        with Pool(workers) as pool:
+            for chunk in pool.imap(decypher_chunk, batches(messages, batch_size)):
+                yield from chunk
+    else:
+        for batch in batches(messages, batch_size):
+            yield from decypher_chunk(batch)
+
+
+def decypher_stream(
+        input: TextIO,
+        output: TextIO,
+        batch_size: int = BATCH_SIZE,
+        workers: int = 1) -> None:
+    batch: list[str] = []
+    for decyphered in decypher_batch(input, batch_size, workers):
+        batch.append(decyphered)
+        if len(batch) == batch_size:
+            output.write("\n".join(batch) + "\n")
+            batch.clear()
+    if batch:
+        output.write("\n".join(batch) + "\n")
+    output.flush()
+
+
 def test() -> None:
     assert decypher(
         "The only way everyone reaches Brenda rapidly is delivering groceries explicitly"
@@ -16,13 +78,37 @@ def test() -> None:
     assert decypher(
         "Have you delivered eggplant pizza at restored keep?"
     ) == "hydepark"
+    messages: list[str] = [
+        "The only way everyone reaches Brenda rapidly is delivering groceries explicitly\n",
+        "Britain is Great because everyone necessitates\n",
+        "",
+        "   \t  \n",
+        "Have you delivered eggplant pizza at restored keep?",
+        "İstanbul Σοφία ΣΣ ÉCOLE",
+    ]
+    expected: list[str] = [decypher(message) for message in messages]
+    assert list(decypher_batch(messages)) == expected
+    assert list(decypher_batch(messages, batch_size=2)) == expected
+    assert list(decypher_batch(messages, batch_size=2, workers=2)) == expected
+    assert list(decypher_batch([])) == []
     print("Well done!!!")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("message", help="Decypher the string you use here", type=str)
+    parser.add_argument("message", help="Decypher the string you use here", type=str, nargs="?")
+    parser.add_argument("--batch", help="Decypher newline-delimited messages from stdin", action="store_true")
+    parser.add_argument("--file", help="Decypher newline-delimited messages from the file")
+    parser.add_argument("--workers", help="Number of processes for the batch mode", type=int, default=1)
     args = parser.parse_args()
-    print(decypher(args.message))
+    if args.file:
+        with open(args.file, "r") as file:
+            decypher_stream(file, sys.stdout, workers=args.workers)
+    elif args.batch:
+        decypher_stream(sys.stdin, sys.stdout, workers=args.workers)
+    elif args.message is None:
+        parser.error("the message is required without --batch or --file")
+    else:
+        print(decypher(args.message))
 
     # test()
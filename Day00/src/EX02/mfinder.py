@@ -1,4 +1,67 @@
 import sys
+import argparse
+from collections import defaultdict
+from typing import Iterable
+
+
+M_PATTERN: tuple[str, ...] = (
+    "*...*",
+    "**.**",
+    "*.*.*",
+)
+# '*' -> '1', any other symbol -> '0'
+PlanRow = tuple[tuple[int, ...], tuple[int, ...]]
+STAR_TABLE: defaultdict[int, str] = defaultdict(lambda: "0", {ord("*"): "1"})
+
+
+def row_mask(row: str) -> int:
+    """Bit c of the mask is set when row[c] is a star"""
+    return int(row[::-1].translate(STAR_TABLE), 2) if row else 0
+
+
+def compile_pattern(pattern: Iterable[str]) -> list[PlanRow]:
+    """Shifts for every row of the pattern: the stars and the other symbols"""
+    return [
+        (
+            tuple(i for i, symbol in enumerate(row) if symbol == "*"),
+            tuple(i for i, symbol in enumerate(row) if symbol != "*"),
+        )
+        for row in pattern
+    ]
+
+
+M_PLAN: list[PlanRow] = compile_pattern(M_PATTERN)
+
+
+def match_row(stars: int, width: int, plan_row: PlanRow) -> int:
+    """Bit c is set when the pattern row fits the image row from column c"""
+    star_shifts, other_shifts = plan_row
+    others: int = ~stars & ((1 << width) - 1)
+    matches: int = (1 << width) - 1
+    for shift in star_shifts:
+        matches &= stars >> shift
+    for shift in other_shifts:
+        matches &= others >> shift
+    return matches
+
+
+def find_m_patterns(
+        image: list[str],
+        plan: list[PlanRow] = M_PLAN) -> list[tuple[int, int]]:
+    """(row, column) of the top left corner of every pattern in the image"""
+    masks: list[tuple[int, int]] = [(row_mask(row), len(row)) for row in image]
+    coordinates: list[tuple[int, int]] = []
+    for top in range(len(image) - len(plan) + 1):
+        found: int = -1
+        for shift, plan_row in enumerate(plan):
+            found &= match_row(*masks[top + shift], plan_row)
+            if not found:
+                break
+        while found:
+            lowest: int = found & -found
+            coordinates.append((top, lowest.bit_length() - 1))
+            found ^= lowest
+    return coordinates
 
 
 def find_m_pattern(image: list[str]) -> bool:
@@ -41,10 +104,47 @@ def test() -> None:
         "**4**",
         "*5*6*"
     ]) == True
+    for image in (
+        ["*d&t*", "**h**", "*l*!*"],
+        ["*****", "*****", "*****"],
+        ["*s*f*", "**f**", "*a***"],
+        ["*s*f*", "**f**", "*****"],
+        ["*s*f*", "**f**", "*g*s*"],
+        ["*123*", "**4**", "*5*6*"],
+    ):
+        assert (find_m_patterns(image) == [(0, 0)]) == find_m_pattern(image)
+    assert find_m_patterns([
+        "..........",
+        ".*...*...*...*",
+        ".**.**.**.**",
+        ".*.*.*.*.*",
+        "*...*",
+    ]) == [(1, 1)]
+    assert find_m_patterns([
+        "*...**...*",
+        "**.****.**",
+        "*.*.**.*.*",
+        "*...*",
+        "**.**",
+        "*.*.*",
+    ]) == [(0, 0), (0, 5), (3, 0)]
+    assert find_m_patterns(["*...*", "**.**"]) == []
+    assert find_m_patterns([]) == []
     print("Well done!!!")
 
 
+def scan() -> None:
+    image: list[str] = [line.rstrip("\r\n") for line in sys.stdin]
+    for row, column in find_m_patterns(image):
+        print(row, column)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scan", help="Print coordinates of every M-pattern in an image of any size", action="store_true")
+    if parser.parse_args().scan:
+        scan()
+        exit(0)
     try:
         image: list[str] = sys.stdin.readlines()
         for i in range(len(image)):
@@ -0,0 +1,40 @@
+import sys
+import tracemalloc
+from time import time
+
+import purse
+
+
+def measure(make):
+    tracemalloc.start()
+    start = time()
+    result = make()
+    elapsed = time() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, memory
+
+
+if __name__ == "__main__":
+    number_of_purses: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    dicts, time_dicts, memory_dicts = measure(
+        lambda: [purse.add_ingot(purse.empty({})) for _ in range(number_of_purses)]
+    )
+    slotted, time_slotted, memory_slotted = measure(
+        lambda: [purse.Purse().add_ingot() for _ in range(number_of_purses)]
+    )
+    array, time_array, memory_array = measure(
+        lambda: purse.add_ingots(purse.empty_all(purse.PurseArray(range(number_of_purses))))
+    )
+    assert [d["gold_ingots"] for d in dicts] == [p.gold_ingots for p in slotted] == array.ingots.tolist()
+
+    for name, elapsed, memory in (
+        ("dict functions", time_dicts, memory_dicts),
+        ("Purse", time_slotted, memory_slotted),
+        ("PurseArray", time_array, memory_array),
+    ):
+        print(
+            f"{name:<15} {number_of_purses / elapsed:>14,.0f} purses/s"
+            f" {memory / number_of_purses:>8.1f} bytes/purse"
+        )
@@ -1,4 +1,7 @@
-from typing import Dict
+from array import array
+from itertools import repeat
+from operator import add, sub
+from typing import Dict, Iterable, Iterator, Sized
 
 
 def get_ingot_count(purse: Dict[str, int]) -> int:
@@ -25,6 +28,91 @@ def empty(purse: Dict[str, int]) -> Dict[str, int]:
     return new_purse
 
 
+class Purse:
+    """The same purse as {"gold_ingots": n}, every operation returns a new one"""
+    __slots__ = ("gold_ingots",)
+
+    def __init__(self, gold_ingots: int = 0) -> None:
+        self.gold_ingots: int = gold_ingots
+
+    @classmethod
+    def from_dict(cls, purse: Dict[str, int]) -> "Purse":
+        return cls(get_ingot_count(purse))
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"gold_ingots": self.gold_ingots}
+
+    def add_ingot(self) -> "Purse":
+        return Purse(self.gold_ingots + 1)
+
+    def get_ingot(self) -> "Purse":
+        return Purse(self.gold_ingots - 1 if self.gold_ingots > 0 else 0)
+
+    def empty(self) -> "Purse":
+        return Purse()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Purse):
+            return NotImplemented
+        return self.gold_ingots == other.gold_ingots
+
+    def __repr__(self) -> str:
+        return f"Purse(gold_ingots={self.gold_ingots})"
+
+
+class PurseArray:
+    """Many purses in one array of ingot counts, 8 bytes per purse"""
+    __slots__ = ("ingots",)
+
+    def __init__(self, ingots: Iterable[int] = ()) -> None:
+        self.ingots: array = ingots if isinstance(ingots, array) else array("q", ingots)
+
+    @classmethod
+    def from_purses(cls, purses: Iterable[Purse]) -> "PurseArray":
+        return cls(purse.gold_ingots for purse in purses)
+
+    def __len__(self) -> int:
+        return len(self.ingots)
+
+    def __getitem__(self, index: int) -> Purse:
+        return Purse(self.ingots[index])
+
+    def __iter__(self) -> Iterator[Purse]:
+        return map(Purse, self.ingots)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PurseArray):
+            return NotImplemented
+        return self.ingots == other.ingots
+
+    def __repr__(self) -> str:
+        return f"PurseArray({self.ingots.tolist()})"
+
+
+def counts_for(purses: PurseArray, counts: Iterable[int] | int) -> Iterable[int]:
+    if isinstance(counts, int):
+        return repeat(counts, len(purses))
+    if isinstance(counts, Sized) and len(counts) != len(purses):
+        raise ValueError(f"{len(counts)} counts for {len(purses)} purses")
+    return counts
+
+
+def add_ingots(purses: PurseArray, counts: Iterable[int] | int = 1) -> PurseArray:
+    return PurseArray(array("q", map(add, purses.ingots, counts_for(purses, counts))))
+
+
+def get_ingots(purses: PurseArray, counts: Iterable[int] | int = 1) -> PurseArray:
+    return PurseArray(array("q", map(
+        max,
+        repeat(0),
+        map(sub, purses.ingots, counts_for(purses, counts)),
+    )))
+
+
+def empty_all(purses: PurseArray) -> PurseArray:
+    return PurseArray(array("q", bytes(len(purses) * array("q").itemsize)))
+
+
 def test() -> None:
     # test for empty()
     assert empty({}) == {"gold_ingots": 0}
@@ -47,6 +135,24 @@ def test() -> None:
         {"gold_ingots": 1})))) == {"gold_ingots": 1}
     assert get_ingot(add_ingot(get_ingot(add_ingot(empty(
         {}))))) == {"gold_ingots": 0}
+    # tests for Purse
+    for purse in ({}, {"gold_ingots": 0}, {"gold_ingots": 1}, {"gold_ingots": 10}, {"gold": 10}):
+        assert Purse.from_dict(purse).add_ingot().to_dict() == add_ingot(purse)
+        assert Purse.from_dict(purse).get_ingot().to_dict() == get_ingot(purse)
+        assert Purse.from_dict(purse).empty().to_dict() == empty(purse)
+    purse = Purse(3)
+    assert purse.add_ingot() == Purse(4) and purse == Purse(3)
+    # tests for PurseArray
+    purses = PurseArray([0, 1, 5])
+    assert add_ingots(purses) == PurseArray([1, 2, 6])
+    assert add_ingots(purses, [3, 0, 1]) == PurseArray([3, 1, 6])
+    assert get_ingots(purses) == PurseArray([0, 0, 4])
+    assert get_ingots(purses, [1, 3, 2]) == PurseArray([0, 0, 3])
+    assert empty_all(purses) == PurseArray([0, 0, 0])
+    assert purses == PurseArray([0, 1, 5])
+    assert list(purses) == [Purse(0), Purse(1), Purse(5)]
+    assert PurseArray.from_purses(purses) == purses
+    assert add_ingots(PurseArray()) == PurseArray()
     print("Tests passed!")
 
 
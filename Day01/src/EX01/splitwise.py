@@ -1,17 +1,26 @@
-from typing import Dict, Tuple
+from typing import Any, Dict, Iterable, Tuple
 
 
-def splitwise(*args: Dict[str, int]) -> Tuple[Dict[str, int], ...]:
-    count_ingot: int = 0
-    for purse in args:
-        if "gold_ingot" in purse:
-            count_ingot += purse["gold_ingot"]
-    purse_1 = {"gold_ingot": count_ingot//3}
-    count_ingot -= count_ingot//3
-    purse_2 = {"gold_ingot": count_ingot//2}
-    count_ingot -= count_ingot//2
-    purse_3 = {"gold_ingot": count_ingot}
-    return (purse_1, purse_2, purse_3)
+def split_total(count_ingot: int, n: int = 3) -> Tuple[Dict[str, int], ...]:
+    if n < 1:
+        raise ValueError(f"Can't split ingots into {n} purses")
+    share, rest = divmod(count_ingot, n)
+    return tuple(
+        {"gold_ingot": share + (i >= n - rest)} for i in range(n)
+    )
+
+
+def splitwise(*args: Dict[str, int], n: int = 3) -> Tuple[Dict[str, int], ...]:
+    count_ingot: int = sum(purse.get("gold_ingot", 0) for purse in args)
+    return split_total(count_ingot, n)
+
+
+def splitwise_counts(counts: Iterable[int] | Any, n: int = 3) -> Tuple[Dict[str, int], ...]:
+    """Split the ingot counts of many purses without building a dict per purse,
+    counts can be any iterable of ints or a NumPy array"""
+    if hasattr(counts, "sum"):
+        return split_total(int(counts.sum()), n)
+    return split_total(sum(counts), n)
 
 
 def test() -> None:
@@ -87,6 +96,20 @@ def test() -> None:
         purse_3["gold_ingot"]
     ) <= 1
 
+    for count_ingot in (0, 1, 5, 9, 10, 1000003):
+        for n in (1, 2, 3, 7, 64):
+            purses = splitwise({"gold_ingot": count_ingot}, {"apple": 10}, n=n)
+            ingots = [purse["gold_ingot"] for purse in purses]
+            assert len(purses) == n
+            assert sum(ingots) == count_ingot
+            assert max(ingots) - min(ingots) <= 1
+            assert splitwise_counts([count_ingot, 0], n=n) == purses
+    assert splitwise({"gold_ingot": 5}, {"gold_ingot": 5}) == (
+        {"gold_ingot": 3}, {"gold_ingot": 3}, {"gold_ingot": 4}
+    )
+    assert splitwise_counts(range(100001), n=1) == ({"gold_ingot": 5000050000},)
+    assert splitwise_counts(iter([]), n=2) == ({"gold_ingot": 0}, {"gold_ingot": 0})
+
     print("Tests passed!")
 
 
@@ -1,12 +1,114 @@
-from typing import Dict
+import sys
+import logging
+from collections import Counter, defaultdict, deque
+from functools import wraps
+from logging.handlers import MemoryHandler
+from time import perf_counter
+from typing import Callable, Dict
 
 
-def decorator(func):
-    def wrapper(*args, **kwargs):
-        print("SQUEAK")
-        new_purse = func(*args, **kwargs)
-        return new_purse
-    return wrapper
+class Instrumentation:
+    """Decorator which collects call counts, latency and argument sizes.
+
+    While it is disabled the decorated names are bound to the original
+    functions, so a call costs exactly as much as without the decorator.
+    enable() and disable() rebind the names in the modules of the functions
+    only: a caller which did `from purse_decor import add_ingot` keeps the
+    function it imported and is never instrumented. Decorate such functions
+    with @instrument.guarded instead, which checks the flag on every call.
+    Methods and nested functions have no module global to rebind, they are
+    always decorated as guarded.
+    Only every sample_rate-th call is timed, sampled_latency is the total of
+    the timed calls.
+    """
+    def __init__(self,
+                 size: int = 1024,
+                 sample_rate: int = 1,
+                 logger: logging.Logger | None = None) -> None:
+        self.enabled: bool = False
+        self.sample_rate: int = sample_rate
+        self.logger: logging.Logger | None = logger
+        self.records: deque[tuple[str, float, int]] = deque(maxlen=size)
+        self.calls: Counter[str] = Counter()
+        self.sampled_latency: defaultdict[str, float] = defaultdict(float)
+        self.functions: list[Callable] = []
+
+    def __call__(self, func: Callable) -> Callable:
+        if func.__qualname__ != func.__name__:
+            return self.guarded(func)
+        self.functions.append(func)
+        return self.wrap(func) if self.enabled else func
+
+    def wrap(self, func: Callable) -> Callable:
+        name: str = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self.calls[name] += 1
+            if self.calls[name] % self.sample_rate:
+                return func(*args, **kwargs)
+            start: float = perf_counter()
+            result = func(*args, **kwargs)
+            elapsed: float = perf_counter() - start
+            size: int = sum(map(sys.getsizeof, args)) + sum(map(sys.getsizeof, kwargs.values()))
+            self.sampled_latency[name] += elapsed
+            self.records.append((name, elapsed, size))
+            if self.logger is not None:
+                self.logger.debug("SQUEAK %s %.9f %d", name, elapsed, size)
+            return result
+        return wrapper
+
+    def guarded(self, func: Callable) -> Callable:
+        """Always wrapped, a call while disabled costs one check of the flag"""
+        wrapped: Callable = self.wrap(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.enabled:
+                return wrapped(*args, **kwargs)
+            return func(*args, **kwargs)
+        return wrapper
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.rebind()
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.rebind()
+        if self.logger is not None:
+            for handler in self.logger.handlers:
+                handler.flush()
+
+    def rebind(self) -> None:
+        for func in self.functions:
+            setattr(
+                sys.modules[func.__module__],
+                func.__name__,
+                self.wrap(func) if self.enabled else func,
+            )
+
+    def reset(self) -> None:
+        self.records.clear()
+        self.calls.clear()
+        self.sampled_latency.clear()
+
+
+def buffered_logger(name: str = "squeak", capacity: int = 1000) -> logging.Logger:
+    """Logger which keeps up to capacity records in memory and writes them at once"""
+    logger: logging.Logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    if not logger.handlers:
+        logger.addHandler(MemoryHandler(
+            capacity,
+            flushLevel=logging.ERROR,
+            target=logging.StreamHandler(sys.stderr),
+        ))
+    return logger
+
+
+instrument = Instrumentation()
 
 
 def get_ingot_count(purse: Dict[str, int]) -> int:
@@ -16,27 +118,82 @@ def get_ingot_count(purse: Dict[str, int]) -> int:
         return purse["gold_ingots"]
 
 
-@decorator
+@instrument
 def add_ingot(purse: Dict[str, int]) -> Dict[str, int]:
     ignots: int = get_ingot_count(purse) + 1
     new_purse = {"gold_ingots": ignots}
     return new_purse
 
 
-@decorator
+@instrument
 def get_ingot(purse: Dict[str, int]) -> Dict[str, int]:
     ignots: int = 0 if get_ingot_count(purse) == 0 else purse["gold_ingots"] - 1
     new_purse = {"gold_ingots": ignots}
     return new_purse
 
 
-@decorator
+@instrument
 def empty(purse: Dict[str, int]) -> Dict[str, int]:
     new_purse = {"gold_ingots": 0}
     return new_purse
 
 
+def test() -> None:
+    instrument.reset()
+    assert not hasattr(add_ingot, "__wrapped__")
+    instrument.enable()
+    assert add_ingot(get_ingot(add_ingot(empty({"gold_ingots": 10})))) == {"gold_ingots": 1}
+    assert instrument.calls == {"add_ingot": 2, "get_ingot": 1, "empty": 1}
+    assert [record[0] for record in instrument.records] == ["empty", "add_ingot", "get_ingot", "add_ingot"]
+    instrument.disable()
+    assert add_ingot({}) == {"gold_ingots": 1}
+    assert instrument.calls["add_ingot"] == 2
+    instrument.sample_rate = 1000
+    instrument.enable()
+    purse: Dict[str, int] = {}
+    for _ in range(3000):
+        purse = add_ingot(purse)
+    instrument.disable()
+    assert purse == {"gold_ingots": 3000}
+    assert instrument.calls["add_ingot"] == 3002
+    assert len(instrument.records) == 4 + 3
+    assert set(instrument.sampled_latency) == {"add_ingot", "get_ingot", "empty"}
+    instrument.sample_rate = 1
+    instrument.reset()
+
+    imported = add_ingot
+    instrument.enable()
+    imported({})
+    assert instrument.calls == {}
+    instrument.disable()
+    guarded = instrument.guarded(get_ingot_count)
+    assert guarded({"gold_ingots": 2}) == 2 and instrument.calls == {}
+    instrument.enable()
+    assert guarded({"gold_ingots": 2}) == 2
+    instrument.disable()
+    assert instrument.calls == {"get_ingot_count": 1}
+    instrument.reset()
+
+    class Bank:
+        @instrument
+        def deposit(self, purse: Dict[str, int]) -> Dict[str, int]:
+            return add_ingot(purse)
+
+    instrument.enable()
+    assert Bank().deposit({}) == {"gold_ingots": 1}
+    instrument.disable()
+    assert instrument.calls == {"test.<locals>.Bank.deposit": 1, "add_ingot": 1}
+    assert "deposit" not in globals()
+    instrument.reset()
+    print("Tests passed!")
+
+
 if __name__ == "__main__":
+    instrument.logger = buffered_logger()
+    instrument.enable()
     purse = {"gold_ingots": 10}
     new_purse = add_ingot(get_ingot(add_ingot(empty(purse))))
+    instrument.disable()
     print(purse, new_purse)
+    print(dict(instrument.calls), dict(instrument.sampled_latency))
+    # test()
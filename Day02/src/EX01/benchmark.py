@@ -0,0 +1,93 @@
+import itertools
+import sys
+from time import time
+
+from morality import Game, Player, Copycat, Cheater, Cooperator, Grudger, Detective, MyPlayer
+from tournament import Tournament
+from evolution import Evolution
+
+
+CLASSES: list[type[Player]] = [Copycat, Cheater, Cooperator, Grudger, Detective, MyPlayer]
+
+
+def bench_tournament(copies: int, matches: int) -> None:
+    players: list[Player] = [cls() for cls in CLASSES] * copies
+
+    start = time()
+    tournament = Tournament(matches)
+    tournament.play(players)
+    time_tournament = time() - start
+    print(f"Tournament: {len(players)} players, {matches} rounds in {time_tournament:.4f}s")
+
+    # Game.play() replays every pair, so it is measured on a small sample
+    sample: list[Player] = [cls() for cls in CLASSES] * 2
+    start = time()
+    game = Game(matches)
+    for player1, player2 in itertools.combinations(sample, 2):
+        game.play(player1, player2)
+    time_game = time() - start
+    pairs: int = len(players) * (len(players) - 1) // 2
+    sample_pairs: int = len(sample) * (len(sample) - 1) // 2
+    print(f"Game: {len(sample)} players in {time_game:.4f}s, "
+          f"~{time_game / sample_pairs * pairs:.0f}s expected for {len(players)} players")
+
+    tournament = Tournament(matches)
+    tournament.play(sample)
+    assert tournament.registry == game.registry
+
+
+class StringDispatchGame(Game):
+    """Game.play() and player_make_move() as they were before next_move()"""
+    def player_make_move(self, player, prev_opponent_move: str, round_number: int) -> None:
+        if str(player) == "detective":
+            player.detective_move(prev_opponent_move, round_number)
+        elif str(player) in ("copycat", "grudger"):
+            player.make_move(prev_opponent_move)
+        elif str(player) in ("cooperator", "cheater"):
+            player.make_move()
+        else:
+            player.my_player_move(prev_opponent_move, round_number == self.matches-1)
+
+
+    def play(self, player1, player2) -> None:
+        for round in range(self.matches):
+            prev_move_player1 = player1.move
+            prev_move_player2 = player2.move
+            self.player_make_move(player1, prev_move_player2, round)
+            self.player_make_move(player2, prev_move_player1, round)
+            self.count(player1, player2)
+        player1.reset()
+        player2.reset()
+
+
+def bench_dispatch(matches: int) -> None:
+    results: list[Game] = []
+    for game_class in (StringDispatchGame, Game):
+        players: list[Player] = [cls() for cls in CLASSES]
+        pairs = list(itertools.combinations(players, 2))
+        game = game_class(matches)
+        start = time()
+        for player1, player2 in pairs:
+            game.play(player1, player2)
+        elapsed = time() - start
+        results.append(game)
+        print(f"{game_class.__name__}: {len(pairs) * matches / elapsed:>12,.0f} rounds/s")
+    assert results[0].registry == results[1].registry
+
+
+def bench_evolution(generations: int) -> None:
+    for size in (1_000, 10_000, 50_000):
+        population: list[Player] = [CLASSES[i % len(CLASSES)]() for i in range(size)]
+        evolution = Evolution(population, replace=size // 20)
+        start = time()
+        evolution.run(generations)
+        elapsed = time() - start
+        print(f"Evolution: {size} players: {generations / elapsed:.1f} generations/s")
+
+
+if __name__ == "__main__":
+    copies: int = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    matches: int = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    bench_tournament(copies, matches)
+    bench_dispatch(matches)
+    bench_evolution(10)
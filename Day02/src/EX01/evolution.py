@@ -0,0 +1,82 @@
+from collections import Counter
+from itertools import repeat
+
+from morality import Player, Cheater, Cooperator, Copycat, Grudger, Detective, MyPlayer
+from tournament import Strategy, strategy_of, play_match
+
+
+def strategy_scores(groups: Counter[Strategy], matches: int) -> dict[Strategy, int]:
+    """Round-robin score of one player of every strategy in the population.
+
+    Players of the same strategy play the same games, so only one match per
+    pair of strategies is played and weighted by the sizes of the groups:
+    at most 21 matches whatever the size of the population. That work is too
+    small to shard, a process pool only adds the cost of sending the tasks,
+    so the generation runs in one process.
+    """
+    strategies: list[Strategy] = list(groups)
+    pairs: list[tuple[Strategy, Strategy]] = [
+        (first, second)
+        for i, first in enumerate(strategies)
+        for second in strategies[i:]
+    ]
+    firsts = [first for first, _ in pairs]
+    seconds = [second for _, second in pairs]
+    results = map(play_match, firsts, seconds, repeat(matches))
+    scores: dict[Strategy, int] = dict.fromkeys(strategies, 0)
+    for (first, second), (score1, score2) in zip(pairs, results):
+        if first is second:
+            scores[first] += (groups[first] - 1) * score1
+        else:
+            scores[first] += groups[second] * score1
+            scores[second] += groups[first] * score2
+    return scores
+
+
+class Evolution:
+    """Population which plays a round-robin every generation, after that
+    the weakest players are replaced by new players of the strongest ones"""
+    def __init__(self,
+                 population: list[Player],
+                 matches: int = 10,
+                 replace: int = 5) -> None:
+        if not 0 <= replace <= len(population) // 2:
+            raise ValueError(f"Can't replace {replace} of {len(population)} players")
+        self.population: list[Player] = population
+        self.matches: int = matches
+        self.replace: int = replace
+        self.generations: list[Counter] = []
+
+
+    def generation(self) -> Counter:
+        strategies: list[Strategy] = [strategy_of(player) for player in self.population]
+        groups: Counter[Strategy] = Counter(strategies)
+        scores: dict[Strategy, int] = strategy_scores(groups, self.matches)
+        ranked: list[int] = sorted(
+            range(len(self.population)),
+            key=lambda i: scores[strategies[i]],
+        )
+        weakest: list[int] = ranked[:self.replace]
+        strongest: list[int] = ranked[len(ranked) - self.replace:]
+        for weak, strong in zip(weakest, reversed(strongest)):
+            self.population[weak] = type(self.population[strong])()
+        census: Counter = Counter(str(player) for player in self.population)
+        self.generations.append(census)
+        return census
+
+
+    def run(self, generations: int) -> list[Counter]:
+        for _ in range(generations):
+            self.generation()
+        return self.generations
+
+
+if __name__ == "__main__":
+    population: list[Player] = [
+        cls()
+        for _ in range(5)
+        for cls in (Copycat, Cheater, Cooperator, Grudger, Detective, MyPlayer)
+    ]
+    evolution = Evolution(population, replace=3)
+    for number, census in enumerate(evolution.run(10), start=1):
+        print(number, dict(census))
@@ -1,13 +1,42 @@
-from collections import Counter
+from collections import Counter, OrderedDict
 import itertools
-from typing import Any
+import json
+import os
+from typing import Any, Callable
+
+
+STRATEGY_REGISTRY: dict[str, type["Player"]] = {}
+
+
+def register(name: str) -> Callable[[type["Player"]], type["Player"]]:
+    """Class decorator which makes a strategy available by its name"""
+    def decorator(cls: type["Player"]) -> type["Player"]:
+        STRATEGY_REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def make_player(name: str) -> "Player":
+    return STRATEGY_REGISTRY[name]()
 
 
 class Player:
+    __slots__ = ("move",)
+    # a strategy which always plays the same way against the same opponent
+    # sets it to True in its own class body, subclasses don't inherit it
+    deterministic: bool = False
+    # bump it when the strategy changes, saved results of the old one
+    # are not used for the new one
+    version: str = "1"
+
     def __init__(self) -> None:
         self.move: str | None = None
 
 
+    def next_move(self, prev_opponent_move: str | None, round_number: int, matches: int) -> None:
+        raise NotImplementedError
+
+
     def cheat(self) -> None:
         self.move = "cheat"
 
@@ -20,25 +49,45 @@ class Player:
         self.move = None
 
 
+@register("cheater")
 class Cheater(Player):
+    __slots__ = ()
+    deterministic: bool = True
+
     def make_move(self) -> None:
         self.cheat()
 
 
+    def next_move(self, prev_opponent_move: str | None, round_number: int, matches: int) -> None:
+        self.move = "cheat"
+
+
     def __str__(self) -> str:
         return "cheater"
 
 
+@register("cooperator")
 class Cooperator(Player):
+    __slots__ = ()
+    deterministic: bool = True
+
     def make_move(self) -> None:
         self.cooperate()
 
 
+    def next_move(self, prev_opponent_move: str | None, round_number: int, matches: int) -> None:
+        self.move = "cooperate"
+
+
     def __str__(self) -> str:
         return "cooperator"
 
 
+@register("copycat")
 class Copycat(Player):
+    __slots__ = ()
+    deterministic: bool = True
+
     def make_move(self, prev_opponent_move: str | None) -> None:
         if prev_opponent_move == "cheat":
             self.cheat()
@@ -46,11 +95,19 @@ class Copycat(Player):
             self.cooperate()
 
 
+    def next_move(self, prev_opponent_move: str | None, round_number: int, matches: int) -> None:
+        self.move = "cheat" if prev_opponent_move == "cheat" else "cooperate"
+
+
     def __str__(self) -> str:
         return "copycat"
 
 
+@register("grudger")
 class Grudger(Player):
+    __slots__ = ()
+    deterministic: bool = True
+
     def make_move(self, prev_opponent_move: str | None) -> None:
         if self.move == "cheat" or prev_opponent_move == "cheat":
             self.cheat()
@@ -58,11 +115,22 @@ class Grudger(Player):
             self.cooperate()
 
 
+    def next_move(self, prev_opponent_move: str | None, round_number: int, matches: int) -> None:
+        if self.move == "cheat" or prev_opponent_move == "cheat":
+            self.move = "cheat"
+        else:
+            self.move = "cooperate"
+
+
     def __str__(self) -> str:
         return "grudger"
 
 
+@register("detective")
 class Detective(Copycat):
+    __slots__ = ("cheater",)
+    deterministic: bool = True
+
     def __init__(self) -> None:
         super().__init__()
         self.cheater: bool = False
@@ -82,6 +150,10 @@ class Detective(Copycat):
             self.cheat()
 
 
+    def next_move(self, prev_opponent_move: str | None, round_number: int, matches: int) -> None:
+        self.detective_move(prev_opponent_move, round_number)
+
+
     def reset(self) -> None:
         super().reset()
         self.cheater = False
@@ -91,21 +163,101 @@ class Detective(Copycat):
         return "detective"
 
 
+@register("myPlayer")
 class MyPlayer(Copycat):
+    __slots__ = ()
+    deterministic: bool = True
+
     def my_player_move(self, prev_opponent_move: str | None, is_last_round: bool) -> None:
         if not is_last_round:
             super().make_move(prev_opponent_move)
         else:
             self.cheat()
 
+
+    def next_move(self, prev_opponent_move: str | None, round_number: int, matches: int) -> None:
+        if round_number == matches - 1:
+            self.move = "cheat"
+        else:
+            super().next_move(prev_opponent_move, round_number, matches)
+
     def __str__(self):
         return "myPlayer"
 
 
+def is_deterministic(player: Player) -> bool:
+    return type(player).__dict__.get("deterministic", False)
+
+
+def strategy_id(player: Player) -> str:
+    cls: type = type(player)
+    return f"{cls.__module__}.{cls.__qualname__}@{cls.version}"
+
+
+class ResultCache:
+    """LRU cache of match results keyed by both strategies and the number
+    of matches, which can be saved to and loaded from a JSON file"""
+    def __init__(self, maxsize: int = 1024, path: str | None = None) -> None:
+        self.maxsize: int = maxsize
+        self.path: str | None = path
+        self.results: OrderedDict[tuple[str, str, int], tuple[int, int, bool]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+
+    @staticmethod
+    def key(player1: Player, player2: Player, matches: int) -> tuple[str, str, int] | None:
+        if not (is_deterministic(player1) and is_deterministic(player2)):
+            return None
+        return strategy_id(player1), strategy_id(player2), matches
+
+
+    def get(self, key: tuple[str, str, int]) -> tuple[int, int, bool] | None:
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+        return result
+
+
+    def put(self, key: tuple[str, str, int], result: tuple[int, int, bool]) -> None:
+        self.results[key] = result
+        self.results.move_to_end(key)
+        while len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+
+
+    def load(self, path: str) -> None:
+        with open(path, "r") as file:
+            for name1, name2, matches, score1, score2, scored in json.load(file):
+                self.put((name1, name2, matches), (score1, score2, scored))
+
+
+    def save(self, path: str | None = None) -> None:
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the results")
+        with open(path, "w") as file:
+            json.dump([[*key, *result] for key, result in self.results.items()], file)
+
+
+# the same points as Game.count(), nobody gets anything when both cheat
+SCORES: dict[tuple[str, str], tuple[int, int]] = {
+    ("cooperate", "cooperate"): (2, 2),
+    ("cooperate", "cheat"): (-1, 3),
+    ("cheat", "cooperate"): (3, -1),
+}
+
+
 class Game:
-    def __init__(self, matches=10) -> None:
+    def __init__(self, matches=10, cache: ResultCache | None = None) -> None:
         self.matches: int = matches
         self.registry: Counter = Counter()
+        self.cache: ResultCache | None = cache
 
 
     def count(self, player1, player2) -> None:
@@ -121,25 +273,42 @@ class Game:
 
 
     def player_make_move(self, player, prev_opponent_move: str, round_number: int) -> None:
-        if str(player) == "detective":
-            player.detective_move(prev_opponent_move, round_number)
-        elif str(player) in ("copycat", "grudger"):
-            player.make_move(prev_opponent_move)
-        elif str(player) in ("cooperator", "cheater"):
-            player.make_move()
-        else:
-            player.my_player_move(prev_opponent_move, round_number == self.matches-1)
+        player.next_move(prev_opponent_move, round_number, self.matches)
 
 
     def play(self, player1, player2) -> None:
-        for round in range(self.matches):
+        key = None if self.cache is None else self.cache.key(player1, player2, self.matches)
+        result = None if key is None else self.cache.get(key)
+        if result is None:
+            result = self.play_match(player1, player2)
+            if key is not None:
+                self.cache.put(key, result)
+        score1, score2, scored = result
+        if scored:
+            self.registry[str(player1)] += score1
+            self.registry[str(player2)] += score2
+
+
+    def play_match(self, player1, player2) -> tuple[int, int, bool]:
+        matches: int = self.matches
+        next_move1 = player1.next_move
+        next_move2 = player2.next_move
+        score1: int = 0
+        score2: int = 0
+        scored: bool = False
+        for round in range(matches):
             prev_move_player1 = player1.move
             prev_move_player2 = player2.move
-            self.player_make_move(player1, prev_move_player2, round)
-            self.player_make_move(player2, prev_move_player1, round)
-            self.count(player1, player2)
+            next_move1(prev_move_player2, round, matches)
+            next_move2(prev_move_player1, round, matches)
+            points = SCORES.get((player1.move, player2.move))
+            if points is not None:
+                score1 += points[0]
+                score2 += points[1]
+                scored = True
         player1.reset()
         player2.reset()
+        return score1, score2, scored
 
 
     def top3(self) -> None:
@@ -1,5 +1,10 @@
+import os
+import random
+import tempfile
 import unittest
 from morality import *
+from tournament import *
+from evolution import *
 from itertools import combinations
 
 class TestGame(unittest.TestCase):
@@ -146,5 +151,193 @@ class TestGame(unittest.TestCase):
         self.assertEqual(self.game.registry[str(detective)], 3)
 
 
+    def test_next_move_matches_old_moves(self) -> None:
+        opponent_moves = [None, "cooperate", "cheat", "cooperate", "cooperate", "cheat", "cheat", "cooperate"]
+        for cls in (Copycat, Cheater, Cooperator, Grudger, Detective, MyPlayer):
+            old, new = cls(), cls()
+            for round, prev_opponent_move in enumerate(opponent_moves):
+                if isinstance(old, Detective):
+                    old.detective_move(prev_opponent_move, round)
+                elif isinstance(old, MyPlayer):
+                    old.my_player_move(prev_opponent_move, round == len(opponent_moves) - 1)
+                elif isinstance(old, (Copycat, Grudger)):
+                    old.make_move(prev_opponent_move)
+                else:
+                    old.make_move()
+                new.next_move(prev_opponent_move, round, len(opponent_moves))
+                self.assertEqual(new.move, old.move, msg=f"{new}, round {round}")
+
+
+    def test_slots(self) -> None:
+        for player in self.players:
+            self.assertFalse(hasattr(player, "__dict__"))
+
+
+    def test_registry(self) -> None:
+        @register("alternator")
+        class Alternator(Player):
+            __slots__ = ()
+
+            def next_move(self, prev_opponent_move, round_number, matches) -> None:
+                self.move = "cheat" if round_number % 2 else "cooperate"
+
+            def __str__(self) -> str:
+                return "alternator"
+
+        try:
+            self.assertIs(STRATEGY_REGISTRY["copycat"], Copycat)
+            self.assertIsInstance(make_player("detective"), Detective)
+            self.game.play(make_player("alternator"), make_player("cooperator"))
+            self.assertEqual(self.game.registry["alternator"], 5 * 2 + 5 * 3)
+            self.assertEqual(self.game.registry["cooperator"], 5 * 2 - 5)
+        finally:
+            del STRATEGY_REGISTRY["alternator"]
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.classes = [Copycat, Cheater, Cooperator, Grudger, Detective, MyPlayer]
+
+
+    def play_all(self, game: Game) -> Counter:
+        players = [cls() for cls in self.classes] * 2
+        for player1, player2 in combinations(players, 2):
+            game.play(player1, player2)
+        return game.registry
+
+
+    def test_same_results(self) -> None:
+        cache = ResultCache()
+        expected = self.play_all(Game())
+        self.assertEqual(self.play_all(Game(cache=cache)), expected)
+        self.assertEqual(cache.hits, 66 - 36)
+        self.assertEqual(self.play_all(Game(cache=cache)), expected)
+        self.assertEqual(cache.misses, 36)
+        self.assertEqual(self.play_all(Game(cache=cache)).most_common(3), expected.most_common(3))
+
+
+    def test_lru(self) -> None:
+        cache = ResultCache(maxsize=2)
+        game = Game(cache=cache)
+        game.play(Copycat(), Cheater())
+        game.play(Copycat(), Cooperator())
+        game.play(Copycat(), Cheater())
+        game.play(Copycat(), Grudger())
+        self.assertEqual(list(cache.results), [
+            ("morality.Copycat@1", "morality.Cheater@1", 10),
+            ("morality.Copycat@1", "morality.Grudger@1", 10),
+        ])
+
+
+    def test_key_module_and_version(self) -> None:
+        Other = type("Copycat", (Cheater,), {"__slots__": (), "__module__": "other", "deterministic": True})
+        Changed = type("Copycat", (Copycat,), {"__slots__": (), "deterministic": True, "version": "2"})
+        keys = {ResultCache.key(player(), Cheater(), 10) for player in (Copycat, Other, Changed)}
+        self.assertEqual(len(keys), 3)
+        cache = ResultCache()
+        game = Game(cache=cache)
+        game.play(Copycat(), Cooperator())
+        game.play(Other(), Cooperator())
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(game.registry["copycat"], 2 * 10)
+        self.assertEqual(game.registry["cheater"], 3 * 10)
+
+
+    def test_persistence(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            cache = ResultCache(path=path)
+            expected = self.play_all(Game(5, cache=cache))
+            cache.save()
+            loaded = ResultCache(path=path)
+            self.assertEqual(loaded.results, cache.results)
+            self.assertEqual(self.play_all(Game(5, cache=loaded)), expected)
+            self.assertEqual(loaded.misses, 0)
+
+
+    def test_non_deterministic(self) -> None:
+        class Gambler(Cooperator):
+            __slots__ = ()
+
+            def next_move(self, prev_opponent_move, round_number, matches) -> None:
+                self.move = random.choice(("cheat", "cooperate"))
+
+        cache = ResultCache()
+        game = Game(cache=cache)
+        game.play(Gambler(), Copycat())
+        game.play(Copycat(), Gambler())
+        self.assertEqual(len(cache.results), 0)
+        self.assertEqual(cache.hits + cache.misses, 0)
+
+
+class TestTournament(unittest.TestCase):
+    def setUp(self) -> None:
+        self.classes = [Copycat, Cheater, Cooperator, Grudger, Detective, MyPlayer]
+
+
+    def test_matches_game(self) -> None:
+        for matches in range(25):
+            for class1, class2 in combinations(self.classes, 2):
+                player1, player2 = class1(), class2()
+                game = Game(matches)
+                game.play(player1, player2)
+                self.assertEqual(
+                    play_match(strategy_of(player1), strategy_of(player2), matches),
+                    (game.registry[str(player1)], game.registry[str(player2)]),
+                    msg=f"{player1} vs {player2}, {matches} matches"
+                )
+
+
+    def test_results(self) -> None:
+        players = [Copycat(), Cheater(), Cooperator(), Grudger(), Detective(), MyPlayer()]
+        game = Game()
+        for player1, player2 in combinations(players * 3, 2):
+            game.play(player1, player2)
+        tournament = Tournament()
+        tournament.play(players * 3)
+        self.assertEqual(tournament.registry, game.registry)
+        self.assertEqual(tournament.registry.most_common(3), game.registry.most_common(3))
+
+
+    def test_long_match(self) -> None:
+        self.assertEqual(play_match(COPYCAT, CHEATER, 10000), (-1, 3))
+        self.assertEqual(play_match(DETECTIVE, COOPERATOR, 10000), (9 + 3 * 9996, 5 - 9996))
+        self.assertEqual(play_match(MY_PLAYER, COPYCAT, 10000), (2 * 9999 + 3, 2 * 9999 - 1))
+
+
+    def test_unknown_player(self) -> None:
+        with self.assertRaises(ValueError):
+            Tournament().play([Player()])
+
+
+class TestEvolution(unittest.TestCase):
+    def setUp(self) -> None:
+        self.classes = [Copycat, Cheater, Cooperator, Grudger, Detective, MyPlayer]
+
+
+    def test_scores_match_tournament(self) -> None:
+        players = [cls() for _ in range(4) for cls in self.classes]
+        tournament = Tournament()
+        tournament.play(players)
+        groups = Counter(strategy_of(player) for player in players)
+        for strategy, score in strategy_scores(groups, 10).items():
+            self.assertEqual(score * groups[strategy], tournament.registry[strategy.name])
+
+
+    def test_generation(self) -> None:
+        players = [cls() for _ in range(5) for cls in self.classes]
+        evolution = Evolution(players, replace=3)
+        census = evolution.generation()
+        self.assertEqual(sum(census.values()), 30)
+        self.assertEqual(census["myPlayer"], 8)
+        self.assertEqual(census["cheater"], 2)
+        self.assertEqual(evolution.run(20)[-1], Counter({"myPlayer": 30}))
+
+
+    def test_replace_too_many(self) -> None:
+        with self.assertRaises(ValueError):
+            Evolution([Cheater(), Copycat()], replace=2)
+
+
 if __name__ == "__main__":
     unittest.main()
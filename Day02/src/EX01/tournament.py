@@ -0,0 +1,182 @@
+from collections import Counter
+from typing import Iterable
+
+from morality import Player, Cheater, Cooperator, Copycat, Grudger, Detective, MyPlayer
+
+
+COOPERATE: int = 0
+CHEAT: int = 1
+MOVES: tuple[str, str] = ("cooperate", "cheat")
+# PAYOFF[my_move][opponent_move], the same points as Game.count()
+PAYOFF: tuple[tuple[int, int], tuple[int, int]] = (
+    (2, -1),
+    (3, 0),
+)
+
+
+class Strategy:
+    """Strategy as a finite state machine.
+
+    moves[state] is the move made in the state, transitions[state][opponent_move]
+    is the state for the next round. last_move, if set, replaces the move of the
+    last round of a match.
+    """
+    __slots__ = ("name", "moves", "transitions", "initial", "last_move")
+
+    def __init__(self,
+                 name: str,
+                 moves: tuple[int, ...],
+                 transitions: tuple[tuple[int, int], ...],
+                 initial: int = 0,
+                 last_move: int | None = None) -> None:
+        self.name: str = name
+        self.moves: tuple[int, ...] = moves
+        self.transitions: tuple[tuple[int, int], ...] = transitions
+        self.initial: int = initial
+        self.last_move: int | None = last_move
+
+
+    def __repr__(self) -> str:
+        return f"Strategy({self.name!r})"
+
+
+CHEATER = Strategy("cheater", (CHEAT,), ((0, 0),))
+COOPERATOR = Strategy("cooperator", (COOPERATE,), ((0, 0),))
+# 0 - cooperate, 1 - cheat after the opponent cheated
+COPYCAT = Strategy("copycat", (COOPERATE, CHEAT), ((0, 1), (0, 1)))
+# 0 - cooperate, 1 - cheat forever
+GRUDGER = Strategy("grudger", (COOPERATE, CHEAT), ((0, 1), (1, 1)))
+# 0-6 - the scripted rounds 0-3 with and without a cheating opponent,
+# 7, 8 - copycat after the opponent cheated, 9 - cheat while nobody cheated back
+DETECTIVE = Strategy(
+    "detective",
+    (COOPERATE, CHEAT, CHEAT, COOPERATE, COOPERATE, COOPERATE, COOPERATE, COOPERATE, CHEAT, CHEAT),
+    (
+        (1, 2),  # round 0
+        (3, 4),  # round 1
+        (4, 4),  # round 1, opponent cheated
+        (5, 6),  # round 2
+        (6, 6),  # round 2, opponent cheated
+        (9, 8),  # round 3
+        (7, 8),  # round 3, opponent cheated
+        (7, 8),
+        (7, 8),
+        (9, 8),
+    ),
+)
+MY_PLAYER = Strategy("myPlayer", COPYCAT.moves, COPYCAT.transitions, last_move=CHEAT)
+
+STRATEGIES: dict[type[Player], Strategy] = {
+    Cheater: CHEATER,
+    Cooperator: COOPERATOR,
+    Copycat: COPYCAT,
+    Grudger: GRUDGER,
+    Detective: DETECTIVE,
+    MyPlayer: MY_PLAYER,
+}
+
+
+def strategy_of(player: Player) -> Strategy:
+    try:
+        return STRATEGIES[type(player)]
+    except KeyError:
+        raise ValueError(f"No strategy table for {type(player).__name__}") from None
+
+
+def play_match(first: Strategy, second: Strategy, matches: int) -> tuple[int, int]:
+    """Scores of both strategies after a match of the given number of rounds.
+
+    The pair of states decides everything that follows, so once it repeats the
+    rest of the match is a number of whole cycles plus a short tail.
+    """
+    if matches <= 0:
+        return 0, 0
+    score1: int = 0
+    score2: int = 0
+    state1: int = first.initial
+    state2: int = second.initial
+    has_last_move: bool = first.last_move is not None or second.last_move is not None
+    regular: int = matches - 1 if has_last_move else matches
+    seen: dict[tuple[int, int], tuple[int, int, int]] | None = {}
+    round: int = 0
+    while round < regular:
+        if seen is not None:
+            key: tuple[int, int] = (state1, state2)
+            if key in seen:
+                start, start_score1, start_score2 = seen[key]
+                length: int = round - start
+                cycles: int = (regular - round) // length
+                score1 += cycles * (score1 - start_score1)
+                score2 += cycles * (score2 - start_score2)
+                round += cycles * length
+                seen = None
+                continue
+            seen[key] = (round, score1, score2)
+        move1: int = first.moves[state1]
+        move2: int = second.moves[state2]
+        score1 += PAYOFF[move1][move2]
+        score2 += PAYOFF[move2][move1]
+        state1 = first.transitions[state1][move2]
+        state2 = second.transitions[state2][move1]
+        round += 1
+    if has_last_move:
+        move1 = first.moves[state1] if first.last_move is None else first.last_move
+        move2 = second.moves[state2] if second.last_move is None else second.last_move
+        score1 += PAYOFF[move1][move2]
+        score2 += PAYOFF[move2][move1]
+    return score1, score2
+
+
+class Tournament:
+    """Round-robin of every pair of players, the same as Game.play() over
+    itertools.combinations(players, 2).
+
+    Players of one strategy always play the same way, so every pair of
+    strategies is played once and its score is multiplied by the number
+    of such pairs of players.
+    """
+    def __init__(self, matches: int = 10) -> None:
+        self.matches: int = matches
+        self.registry: Counter = Counter()
+
+
+    def play(self, players: Iterable[Player | Strategy]) -> Counter:
+        groups: Counter[Strategy] = Counter(
+            player if isinstance(player, Strategy) else strategy_of(player)
+            for player in players
+        )
+        strategies: list[Strategy] = list(groups)
+        for i, first in enumerate(strategies):
+            self.registry[first.name] += 0
+            for second in strategies[i:]:
+                score1, score2 = self.play_pair(first, second)
+                if first is second:
+                    pairs: int = groups[first] * (groups[first] - 1) // 2
+                    self.registry[first.name] += pairs * (score1 + score2)
+                else:
+                    pairs = groups[first] * groups[second]
+                    self.registry[first.name] += pairs * score1
+                    self.registry[second.name] += pairs * score2
+        return self.registry
+
+
+    def play_pair(self, first: Strategy, second: Strategy) -> tuple[int, int]:
+        return play_match(first, second, self.matches)
+
+
+    def top3(self) -> None:
+        for elem in self.registry.most_common(3):
+            player, score = elem
+            print(player, score)
+
+
+if __name__ == "__main__":
+    players: list[Player] = [Copycat(), Cheater(), Cooperator(), Grudger(), Detective()]
+    tournament = Tournament()
+    tournament.play(players)
+    tournament.top3()
+    print()
+    players.append(MyPlayer())
+    tournament = Tournament()
+    tournament.play(players)
+    tournament.top3()
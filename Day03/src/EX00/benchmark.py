@@ -0,0 +1,54 @@
+import sys
+from time import time
+
+from bs4 import BeautifulSoup as bs, Tag
+
+from exploit import Edit, Plan, HACK_PLAN, hack
+
+
+def generate_page(paragraphs: int, targets: int) -> str:
+    body: list[str] = [
+        f'<p class="text">Paragraph {i} with <b>some</b> <i>words</i></p>'
+        for i in range(paragraphs)
+    ]
+    body += [f'<div id="target{i}">target</div>' for i in range(targets)]
+    return (
+        '<html><head><title>Evil Corp</title></head><body>\n'
+        '<p>Welcome, <span class="name"><span class="pronoun">Mr. </span>Alderson</span></p>\n'
+        + '\n'.join(body)
+        + '\n<p>With <a href="https://mrrobot.fandom.com/wiki/E_Corp">Evil Corp</a></p>'
+        '</body></html>'
+    )
+
+
+def mark_edit(i: int) -> Edit:
+    def action(soup: bs, found: dict[str, Tag]) -> None:
+        found[f'target{i}']['class'] = 'hacked'
+    return Edit({f'target{i}': ('div', {'id': f'target{i}'})}, action)
+
+
+def best(func, repeat: int = 3) -> float:
+    times: list[float] = []
+    for _ in range(repeat):
+        start = time()
+        func()
+        times.append(time() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    paragraphs: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    max_edits: int = 32
+    soup: bs = bs(generate_page(paragraphs, max_edits), 'lxml')
+
+    print(f'hack(), 4 finds:  {best(lambda: hack(soup)):.4f}s')
+    print(f'HACK_PLAN, 1 walk: {best(lambda: HACK_PLAN.apply(soup)):.4f}s')
+    edits = 1
+    while edits <= max_edits:
+        plan: Plan = Plan(mark_edit(i) for i in range(edits))
+        time_plan = best(lambda: plan.apply(soup))
+        time_find = best(lambda: [
+            soup.find('div', {'id': f'target{i}'}) for i in range(edits)
+        ])
+        print(f'{edits:>2} edits: one walk {time_plan:.4f}s, {edits} finds {time_find:.4f}s')
+        edits *= 2
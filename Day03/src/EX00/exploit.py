@@ -1,7 +1,31 @@
-from bs4 import BeautifulSoup as bs
+from bs4 import BeautifulSoup as bs, Tag
+from concurrent.futures import ProcessPoolExecutor
+from time import time
+from typing import Callable, Iterable
+import argparse
+import glob
+import lxml.html
 import os
 
 
+TITLE: str = 'Evil Corp - Stealing your money every day'
+HEADER: str = ', you are hacked!'
+SCRIPT: str = '''
+        hacked = function() {
+            alert('hacked');
+        }
+        window.addEventListener('load', 
+        function() { 
+            var f = document.querySelector("form");
+            f.setAttribute("onsubmit", "hacked()");
+        },
+        false
+        );
+        '''
+LINK: str = 'https://mrrobot.fandom.com/wiki/Fsociety'
+LINK_TEXT: str = 'Fsociety'
+
+
 def make_soup(path: str) -> bs:
     with open(path, 'r') as file:
         soup = bs(file, 'lxml')
@@ -36,25 +60,235 @@ def make_new_file(soup: bs, path: str) -> None:
         file.write(str(soup.prettify(formatter='html')))
 
 
-if __name__ == '__main__':
-    path: str = os.path.dirname(__file__)
-    soup: bs = make_soup(path + '/../../materials/evilcorp.html')
-    change_title(soup, 'Evil Corp - Stealing your money every day')
-    add_header(soup, ', you are hacked!')
-    script_insert(
-        soup,
-        '''
-        hacked = function() {
-            alert('hacked');
-        }
-        window.addEventListener('load', 
-        function() { 
-            var f = document.querySelector("form");
-            f.setAttribute("onsubmit", "hacked()");
-        },
-        false
-        );
-        '''
+def hack(soup: bs) -> None:
+    change_title(soup, TITLE)
+    add_header(soup, HEADER)
+    script_insert(soup, SCRIPT)
+    change_link(soup, LINK, LINK_TEXT)
+
+
+class Edit:
+    """One change of the page: the tags it needs, found by name and attributes,
+    and the action which gets the soup and the first tag for every target"""
+    def __init__(self,
+                 targets: dict[str, tuple[str, dict[str, str]]],
+                 action: Callable[[bs, dict[str, Tag]], None]) -> None:
+        self.targets: dict[str, tuple[str, dict[str, str]]] = targets
+        self.action: Callable[[bs, dict[str, Tag]], None] = action
+
+
+class Plan:
+    """Edits compiled once into a table of targets by tag name, so a page
+    is walked only once however many edits there are"""
+    def __init__(self, edits: Iterable[Edit]) -> None:
+        self.edits: list[Edit] = list(edits)
+        self.by_name: dict[str, list[tuple[str, dict[str, str]]]] = {}
+        specs: dict[str, tuple[str, dict[str, str]]] = {}
+        for edit in self.edits:
+            for key, (name, attrs) in edit.targets.items():
+                if key in specs:
+                    # edits share a target only if they look for the same tag
+                    if specs[key] != (name, attrs):
+                        raise ValueError(f'Target {key!r} redeclared as {(name, attrs)}, was {specs[key]}')
+                    continue
+                specs[key] = (name, attrs)
+                self.by_name.setdefault(name, []).append((key, attrs))
+        self.size: int = len(specs)
+
+    @staticmethod
+    def matches(tag: Tag, attrs: dict[str, str]) -> bool:
+        for attr, value in attrs.items():
+            actual = tag.get(attr)
+            if actual is None or (value not in actual if isinstance(actual, list) else value != actual):
+                return False
+        return True
+
+    def find(self, soup: bs) -> dict[str, Tag]:
+        found: dict[str, Tag] = {}
+        for tag in soup.descendants:
+            targets = self.by_name.get(tag.name) if isinstance(tag, Tag) else None
+            if not targets:
+                continue
+            for key, attrs in targets:
+                if key not in found and self.matches(tag, attrs):
+                    found[key] = tag
+            if len(found) == self.size:
+                break
+        return found
+
+    def apply(self, soup: bs) -> None:
+        found: dict[str, Tag] = self.find(soup)
+        for edit in self.edits:
+            edit.action(soup, found)
+
+
+def title_edit(title: str) -> Edit:
+    def action(soup: bs, found: dict[str, Tag]) -> None:
+        found['title'].string = title
+    return Edit({'title': ('title', {})}, action)
+
+
+def header_edit(string: str) -> Edit:
+    def action(soup: bs, found: dict[str, Tag]) -> None:
+        new_h1 = soup.new_tag('h1')
+        new_h1.string = found['name'].text + string
+        found['body'].insert(1, new_h1)
+    return Edit({'name': ('span', {'class': 'name'}), 'body': ('body', {})}, action)
+
+
+def script_edit(script: str) -> Edit:
+    def action(soup: bs, found: dict[str, Tag]) -> None:
+        new_script = soup.new_tag('script')
+        new_script.string = script
+        found['body'].append(new_script)
+    return Edit({'body': ('body', {})}, action)
+
+
+def link_edit(new_link: str, text: str) -> Edit:
+    def action(soup: bs, found: dict[str, Tag]) -> None:
+        found['a']['href'] = new_link
+        found['a'].string = text
+    return Edit({'a': ('a', {})}, action)
+
+
+HACK_PLAN: Plan = Plan([
+    title_edit(TITLE),
+    header_edit(HEADER),
+    script_edit(SCRIPT),
+    link_edit(LINK, LINK_TEXT),
+])
+
+
+def hack_lxml(source: str, pretty: bool = False) -> str:
+    """The same changes as hack() made on the lxml tree without BeautifulSoup,
+    the whole document is parsed, only the BeautifulSoup tree is avoided"""
+    root = lxml.html.document_fromstring(source)
+    root.find('.//title').text = TITLE
+    body = root.find('body')
+    name = next(
+        span for span in root.iter('span')
+        if 'name' in span.get('class', '').split()
     )
-    change_link(soup, 'https://mrrobot.fandom.com/wiki/Fsociety', 'Fsociety')
-    make_new_file(soup, path + '/../../materials/evilcorp_hacked.html')
+    new_h1 = lxml.html.Element('h1')
+    new_h1.text = name.text_content() + HEADER
+    # BeautifulSoup inserts after the first child node, which usually is
+    # the whitespace before the first tag of the body
+    body.insert(0 if body.text else 1, new_h1)
+    new_script = lxml.html.Element('script')
+    new_script.text = SCRIPT
+    body.append(new_script)
+    link = next(root.iter('a'))
+    link.set('href', LINK)
+    for child in list(link):
+        link.remove(child)
+    link.text = LINK_TEXT
+    return lxml.html.tostring(root, encoding='unicode', doctype='<!DOCTYPE html>', pretty_print=pretty)
+
+
+def hacked_path(path: str, output_dir: str | None) -> str:
+    stem, extension = os.path.splitext(os.path.basename(path))
+    if output_dir is None:
+        return os.path.join(os.path.dirname(path), stem + '_hacked' + extension)
+    return os.path.join(output_dir, stem + extension)
+
+
+def rewrite_file(path: str,
+                 output_dir: str | None = None,
+                 engine: str = 'bs4',
+                 pretty: bool = True) -> str:
+    new_path: str = hacked_path(path, output_dir)
+    if engine == 'lxml':
+        with open(path, 'r') as file:
+            html: str = hack_lxml(file.read(), pretty)
+        with open(new_path, 'w') as file:
+            file.write(html)
+        return new_path
+    soup: bs = make_soup(path)
+    if engine == 'plan':
+        HACK_PLAN.apply(soup)
+    else:
+        hack(soup)
+    if pretty:
+        make_new_file(soup, new_path)
+    else:
+        # not the same document: prettify() also adds whitespace text
+        # nodes inside inline tags, e.g. around <b> in <p>a <b>x</b>y</p>
+        with open(new_path, 'w') as file:
+            file.write(str(soup))
+    return new_path
+
+
+def safe_rewrite_file(path: str,
+                      output_dir: str | None = None,
+                      engine: str = 'bs4',
+                      pretty: bool = True) -> tuple[str, str | None]:
+    """rewrite_file() for the batch: a broken page is reported instead of
+    stopping the batch, its output isn't written since the page is changed
+    before the file is opened"""
+    try:
+        return rewrite_file(path, output_dir, engine, pretty), None
+    except Exception as error:
+        return path, f'{type(error).__name__}: {error}'
+
+
+def find_pages(pattern: str) -> list[str]:
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.html')
+    return sorted(
+        path for path in glob.glob(pattern, recursive=True)
+        if not os.path.splitext(path)[0].endswith('_hacked')
+    )
+
+
+def rewrite_batch(paths: Iterable[str],
+                  output_dir: str | None = None,
+                  engine: str = 'bs4',
+                  pretty: bool = True,
+                  workers: int = 1) -> tuple[list[str], dict[str, str]]:
+    """Returns the written pages and the error of every page which failed"""
+    paths = list(paths)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    arguments = (
+        paths,
+        [output_dir] * len(paths),
+        [engine] * len(paths),
+        [pretty] * len(paths),
+    )
+    if workers == 1:
+        results = list(map(safe_rewrite_file, *arguments))
+    else:
+        chunksize: int = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(safe_rewrite_file, *arguments, chunksize=chunksize))
+    written: list[str] = [path for path, error in results if error is None]
+    failed: dict[str, str] = {path: error for path, error in results if error is not None}
+    return written, failed
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages', nargs='?', help='Directory or glob of HTML pages to hack')
+    parser.add_argument('-o', '--output', help='Directory for the hacked pages')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--engine', choices=('bs4', 'plan', 'lxml'), default='bs4')
+    parser.add_argument('--no-prettify', dest='pretty', action='store_false',
+                        help='Write the tree as it is, lxml pretty_print for the lxml engine')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.pages is None:
+        path: str = os.path.dirname(__file__)
+        soup: bs = make_soup(path + '/../../materials/evilcorp.html')
+        hack(soup)
+        make_new_file(soup, path + '/../../materials/evilcorp_hacked.html')
+    else:
+        pages: list[str] = find_pages(args.pages)
+        start = time()
+        written, failed = rewrite_batch(pages, args.output, args.engine, args.pretty, args.workers)
+        elapsed = time() - start
+        for page, error in failed.items():
+            print(f'FAILED {page}: {error}')
+        print(f'{len(written)} pages in {elapsed:.2f}s, {len(pages) / elapsed:.1f} pages/s, {len(failed)} failed')
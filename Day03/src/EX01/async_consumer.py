@@ -0,0 +1,135 @@
+import redis.asyncio
+from typing import List, Dict, FrozenSet
+from time import monotonic
+import argparse
+import asyncio
+import json
+import logging
+
+from consumer import QUEUE, decode_batch, reverse_transaction, parse_accounts
+
+
+REVERSED: str = 'transactions:reversed'
+
+
+async def fetch(redis_client,
+                batches: asyncio.Queue,
+                batch_size: int,
+                workers: int,
+                stop_when_empty: bool) -> None:
+    """Pop batches while the workers are busy with the previous ones"""
+    while True:
+        messages = await redis_client.rpop(QUEUE, batch_size)
+        if not messages:
+            popped = await redis_client.brpop(QUEUE, timeout=1)
+            if popped is None:
+                if stop_when_empty:
+                    break
+                continue
+            messages = [popped[1]]
+        await batches.put(messages)
+    for _ in range(workers):
+        await batches.put(None)
+
+
+async def reverse(batches: asyncio.Queue,
+                  reversed_transactions: asyncio.Queue,
+                  bad_accounts: FrozenSet[int]) -> int:
+    consumed: int = 0
+    while (messages := await batches.get()) is not None:
+        for transaction in decode_batch(messages):
+            if transaction['metadata']['to'] in bad_accounts and transaction['amount'] > 0:
+                await reversed_transactions.put(reverse_transaction(transaction))
+        consumed += len(messages)
+    await reversed_transactions.put(None)
+    return consumed
+
+
+async def write(redis_client,
+                reversed_transactions: asyncio.Queue,
+                workers: int,
+                write_size: int,
+                flush_interval: float) -> int:
+    """Write the reversed transactions to the output stream by batches,
+    a batch goes out when it is full or flush_interval has passed"""
+    written: int = 0
+    finished: int = 0
+    batch: List[Dict] = []
+    deadline: float = monotonic() + flush_interval
+    while finished < workers:
+        try:
+            transaction = await asyncio.wait_for(
+                reversed_transactions.get(), max(0.0, deadline - monotonic()),
+            )
+        except asyncio.TimeoutError:
+            pass
+        else:
+            if transaction is None:
+                finished += 1
+            else:
+                batch.append(transaction)
+        if batch and (len(batch) >= write_size or finished == workers or monotonic() >= deadline):
+            pipeline = redis_client.pipeline(transaction=False)
+            for reversed_transaction in batch:
+                pipeline.xadd(REVERSED, {'data': json.dumps(reversed_transaction)})
+            await pipeline.execute()
+            logging.info(f'HACKED!!! {len(batch)} transactions reversed')
+            written += len(batch)
+            batch = []
+        if monotonic() >= deadline:
+            deadline = monotonic() + flush_interval
+    return written
+
+
+async def consume_async(redis_client,
+                        bad_accounts: FrozenSet[int],
+                        batch_size: int = 1000,
+                        workers: int = 4,
+                        write_size: int = 500,
+                        flush_interval: float = 0.5,
+                        stop_when_empty: bool = False) -> tuple[int, int]:
+    """Fetch, reverse and write back run as separate tasks connected by
+    queues, returns the number of consumed and reversed transactions"""
+    batches: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    reversed_transactions: asyncio.Queue = asyncio.Queue(maxsize=write_size * 4)
+    results = await asyncio.gather(
+        fetch(redis_client, batches, batch_size, workers, stop_when_empty),
+        write(redis_client, reversed_transactions, workers, write_size, flush_interval),
+        *(reverse(batches, reversed_transactions, bad_accounts) for _ in range(workers)),
+    )
+    return sum(results[2:]), results[1]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-e', help="List of bad guys' accounts", required=True)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4, help='Tasks decoding and reversing batches')
+    parser.add_argument('--write-size', type=int, default=500, help='Reversed transactions per pipeline')
+    parser.add_argument('--fake', type=int, metavar='N',
+                        help='Fill in-memory FakeRedis with N transactions and consume them')
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    bad_accounts: FrozenSet[int] = frozenset(parse_accounts(args.e))
+    if args.fake is None:
+        async with redis.asyncio.Redis() as redis_client:
+            await consume_async(redis_client, bad_accounts, args.batch_size, args.workers, args.write_size)
+        return
+    from fake_redis import FakeAsyncRedis
+    from producer import push_transactions_fast
+    redis_client = FakeAsyncRedis()
+    push_transactions_fast(redis_client.client, total=args.fake)
+    start: float = monotonic()
+    consumed, reversed_count = await consume_async(
+        redis_client, bad_accounts, args.batch_size, args.workers, args.write_size, stop_when_empty=True,
+    )
+    elapsed: float = monotonic() - start
+    logging.info(f'{consumed} transactions, {reversed_count} reversed in {elapsed:.2f}s, '
+                 f'{consumed / elapsed:,.0f} messages/s')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parse_args()))
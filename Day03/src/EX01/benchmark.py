@@ -0,0 +1,36 @@
+import sys
+from time import time
+from typing import Callable, Dict, List
+
+import codec
+from producer import get_transactions
+
+
+def best(func: Callable, repeat: int = 3) -> tuple:
+    times: List[float] = []
+    for _ in range(repeat):
+        start = time()
+        result = func()
+        times.append(time() - start)
+    return result, min(times)
+
+
+if __name__ == '__main__':
+    total: int = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    transactions: List[Dict] = [
+        transaction for transaction in get_transactions(total * 2)
+        if all(isinstance(account, int) for account in transaction['metadata'].values())
+    ][:total]
+
+    for name, current in codec.CODECS.items():
+        messages, time_encode = best(lambda: [current.encode(transaction) for transaction in transactions])
+        decoded, time_decode = best(lambda: [codec.decode(message) for message in messages])
+        decoded_batch, time_batch = best(lambda: codec.decode_batch(messages))
+        assert decoded == decoded_batch == transactions
+        size: float = sum(map(len, messages)) / len(messages)
+        print(
+            f'{name:<8} {size:>6.1f} bytes/message'
+            f'  encode {time_encode / len(messages) * 1e9:>6.0f} ns'
+            f'  decode {time_decode / len(messages) * 1e9:>6.0f} ns'
+            f'  batch decode {time_batch / len(messages) * 1e9:>6.0f} ns'
+        )
@@ -0,0 +1,113 @@
+import json
+import struct
+from typing import Dict, List, Any
+
+
+class JsonCodec:
+    """The original format, every message starts with '{'"""
+    name: str = 'json'
+    tag: bytes = b'{'
+
+    def encode(self, transaction: Dict) -> bytes:
+        return json.dumps(transaction, separators=(',', ':')).encode()
+
+    def decode(self, message: bytes | str) -> Dict:
+        return json.loads(message)
+
+    def decode_batch(self, messages: List[bytes]) -> List[Dict]:
+        return json.loads(b'[' + b','.join(messages) + b']')
+
+
+class StructCodec:
+    """Fixed-width message: tag, from and to as int64, amount as int32.
+
+    A transaction which doesn't fit (e.g. an account sent as a string)
+    is encoded as JSON, the tag tells the consumer which one it got.
+    """
+    name: str = 'struct'
+    tag: bytes = b'S'
+    layout: struct.Struct = struct.Struct('<cqqi')
+
+    def encode(self, transaction: Dict) -> bytes:
+        sender = transaction['metadata']['from']
+        receiver = transaction['metadata']['to']
+        amount = transaction['amount']
+        if not all(type(value) is int for value in (sender, receiver, amount)):
+            return JSON.encode(transaction)
+        try:
+            return self.layout.pack(self.tag, sender, receiver, amount)
+        except struct.error:
+            return JSON.encode(transaction)
+
+    def decode(self, message: bytes) -> Dict:
+        if message[:1] != self.tag:
+            return decode(message)
+        _, sender, receiver, amount = self.layout.unpack(message)
+        return {'metadata': {'from': sender, 'to': receiver}, 'amount': amount}
+
+    def decode_batch(self, messages: List[bytes]) -> List[Dict]:
+        data: bytes = b''.join(messages)
+        if len(data) != len(messages) * self.layout.size or data[::self.layout.size].strip(self.tag):
+            return [decode(message) for message in messages]
+        return [
+            {'metadata': {'from': sender, 'to': receiver}, 'amount': amount}
+            for _, sender, receiver, amount in self.layout.iter_unpack(data)
+        ]
+
+
+JSON: JsonCodec = JsonCodec()
+STRUCT: StructCodec = StructCodec()
+CODECS: Dict[str, Any] = {codec.name: codec for codec in (JSON, STRUCT)}
+TAGS: Dict[bytes, Any] = {codec.tag: codec for codec in (JSON, STRUCT)}
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+if msgpack is not None:
+    class MsgpackCodec:
+        """msgpack map, a fixmap of two keys always starts with 0x82"""
+        name: str = 'msgpack'
+        tag: bytes = b'\x82'
+
+        def encode(self, transaction: Dict) -> bytes:
+            return msgpack.packb(transaction)
+
+        def decode(self, message: bytes) -> Dict:
+            return msgpack.unpackb(message, strict_map_key=False)
+
+        def decode_batch(self, messages: List[bytes]) -> List[Dict]:
+            return [decode(message) for message in messages]
+
+    MSGPACK = MsgpackCodec()
+    CODECS[MSGPACK.name] = MSGPACK
+    TAGS[MSGPACK.tag] = MSGPACK
+
+
+def get_codec(name: str) -> Any:
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f'Unknown codec {name!r}, available: {", ".join(CODECS)}') from None
+
+
+def decode(message: bytes | str) -> Dict:
+    """Decode a message of any codec by its first byte"""
+    if isinstance(message, str):
+        return JSON.decode(message)
+    return TAGS[message[:1]].decode(message)
+
+
+def decode_batch(messages: List[bytes | str]) -> List[Dict]:
+    """The codec of the first message decodes the whole batch,
+    it falls back to one message at a time for a mixed batch"""
+    if isinstance(messages[0], str):
+        return json.loads('[' + ','.join(messages) + ']')
+    codec = TAGS.get(messages[0][:1])
+    if codec is None:
+        raise ValueError(f'Unknown message format: {messages[0][:16]!r}')
+    try:
+        return codec.decode_batch(messages)
+    except (ValueError, KeyError):
+        return [decode(message) for message in messages]
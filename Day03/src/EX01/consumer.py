@@ -1,13 +1,19 @@
 import redis
-from typing import List, Dict
+from typing import List, Dict, Iterable, FrozenSet
+from multiprocessing import Process
+from threading import Thread
+from time import monotonic
 import argparse
 import json
 import logging
 
 
+QUEUE: str = 'transactions'
+
+
 def pop_transaction(redis_client) -> None:
     while True:
-        _, transaction = redis_client.brpop('transactions')
+        _, transaction = redis_client.brpop(QUEUE)
         transaction: Dict = json.loads(transaction)
         logging.info(transaction)
         if (transaction['metadata']['to'] in bad_gays_accounts
@@ -26,15 +32,121 @@ def reverse_transaction(transaction: Dict) -> Dict:
     }
 
 
-def parse_accounts() -> List[int]:
+def decode_batch(messages: List) -> List[Dict]:
+    """One json.loads() call for the whole batch instead of one per message,
+    binary messages of the producer's other codecs go to codec.py"""
+    if isinstance(messages[0], str):
+        return json.loads('[' + ','.join(messages) + ']')
+    if messages[0][:1] == b'{':
+        try:
+            return json.loads(b'[' + b','.join(messages) + b']')
+        except ValueError:
+            pass
+    # imported here, so the consumer alone is enough for the JSON deployment
+    from codec import decode_batch as decode_any
+    return decode_any(messages)
+
+
+def pop_batch(redis_client, batch_size: int, timeout: float = 1) -> List:
+    """Up to batch_size messages, RPOP with a count is atomic, so every
+    message is taken by exactly one consumer"""
+    messages = redis_client.rpop(QUEUE, batch_size)
+    if messages:
+        return messages
+    # wait for the next message instead of polling an empty list
+    popped = redis_client.brpop(QUEUE, timeout=timeout)
+    return [popped[1]] if popped else []
+
+
+def handle_batch(transactions: Iterable[Dict], bad_accounts: FrozenSet[int]) -> List[Dict]:
+    hacked: List[Dict] = [
+        reverse_transaction(transaction) for transaction in transactions
+        if transaction['metadata']['to'] in bad_accounts and transaction['amount'] > 0
+    ]
+    for transaction in hacked:
+        logging.info(f'HACKED!!! {transaction}')
+    return hacked
+
+
+def consume_batches(redis_client,
+                    bad_accounts: FrozenSet[int],
+                    batch_size: int = 1000,
+                    stop_when_empty: bool = False) -> int:
+    consumed: int = 0
+    while True:
+        messages: List = pop_batch(redis_client, batch_size, timeout=0.1 if stop_when_empty else 1)
+        if not messages:
+            if stop_when_empty:
+                return consumed
+            continue
+        handle_batch(decode_batch(messages), bad_accounts)
+        consumed += len(messages)
+        logging.debug(f'{consumed} transactions consumed')
+
+
+def consume_worker(bad_accounts: FrozenSet[int], batch_size: int, stop_when_empty: bool) -> None:
+    with redis.Redis() as redis_client:
+        consume_batches(redis_client, bad_accounts, batch_size, stop_when_empty)
+
+
+def run_workers(workers: int,
+                bad_accounts: FrozenSet[int],
+                batch_size: int = 1000,
+                fake_client=None,
+                stop_when_empty: bool = False) -> None:
+    """N consumer processes sharing one Redis list, with FakeRedis the
+    workers are threads, because the list lives in this process"""
+    if fake_client is not None:
+        runners = [
+            Thread(target=consume_batches, args=(fake_client, bad_accounts, batch_size, stop_when_empty))
+            for _ in range(workers)
+        ]
+    else:
+        runners = [
+            Process(target=consume_worker, args=(bad_accounts, batch_size, stop_when_empty))
+            for _ in range(workers)
+        ]
+    for runner in runners:
+        runner.start()
+    for runner in runners:
+        runner.join()
+
+
+def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument('-e', help="List of bad guys' accounts", required=True)
-    args = parser.parse_args()
-    return [int(account) for account in args.e.split(',')]
+    parser.add_argument('--batch-size', type=int, help='Pop transactions in batches of this size')
+    parser.add_argument('--workers', type=int, default=1, help='Number of consumers, more than one selects the batch mode')
+    parser.add_argument('--fake', type=int, metavar='N',
+                        help='Fill in-memory FakeRedis with N transactions and consume them')
+    parser.add_argument('--codec', default='json', help='Codec the producer uses for --fake')
+    return parser.parse_args()
+
+
+def parse_accounts(accounts: str) -> List[int]:
+    return [int(account) for account in accounts.split(',')]
 
 
 if __name__ == '__main__':
-    bad_gays_accounts: List[int] = parse_accounts()
-    logging.basicConfig(level=logging.DEBUG)
-    with redis.Redis(decode_responses=True) as redis_client:
-        pop_transaction(redis_client)
+    args = parse_args()
+    bad_gays_accounts: List[int] = parse_accounts(args.e)
+    if args.batch_size is None and args.fake is None and args.workers == 1:
+        logging.basicConfig(level=logging.DEBUG)
+        with redis.Redis(decode_responses=True) as redis_client:
+            pop_transaction(redis_client)
+    else:
+        logging.basicConfig(level=logging.INFO)
+        bad_accounts: FrozenSet[int] = frozenset(bad_gays_accounts)
+        fake_client = None
+        if args.fake is not None:
+            # imported here, so the consumer alone is enough for the deployment
+            from fake_redis import FakeRedis
+            from producer import push_transactions_fast
+            from codec import get_codec
+            fake_client = FakeRedis()
+            push_transactions_fast(fake_client, total=args.fake, codec=get_codec(args.codec))
+        start: float = monotonic()
+        run_workers(args.workers, bad_accounts, args.batch_size or 1000, fake_client, fake_client is not None)
+        elapsed: float = monotonic() - start
+        if args.fake is not None:
+            logging.info(f'{args.fake} transactions in {elapsed:.2f}s, {args.fake / elapsed:,.0f} messages/s')
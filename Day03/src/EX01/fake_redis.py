@@ -0,0 +1,348 @@
+import asyncio
+import threading
+from bisect import bisect_right
+from collections import defaultdict, deque
+from time import monotonic, time
+from typing import Any, Deque, Dict, List, Tuple
+
+import redis.exceptions
+
+
+class ResponseError(redis.exceptions.ResponseError):
+    pass
+
+
+def parse_id(stream_id: Any) -> Tuple[int, int]:
+    stream_id = stream_id.decode() if isinstance(stream_id, bytes) else str(stream_id)
+    milliseconds, _, sequence = stream_id.partition('-')
+    return int(milliseconds), int(sequence or 0)
+
+
+class FakeGroup:
+    def __init__(self, last_id: Tuple[int, int]) -> None:
+        self.last_id: Tuple[int, int] = last_id
+        # id -> [consumer, delivery time in ms, delivery count]
+        self.pending: Dict[Tuple[int, int], List[Any]] = {}
+
+
+class FakeStream:
+    def __init__(self) -> None:
+        self.entries: Dict[Tuple[int, int], Dict] = {}
+        # ids of the entries in order, to find new entries with bisect
+        self.ids: List[Tuple[int, int]] = []
+        self.last_id: Tuple[int, int] = (0, 0)
+        self.groups: Dict[str, FakeGroup] = {}
+
+
+class FakePipeline:
+    """Queues commands like redis.client.Pipeline and runs them on execute()"""
+    def __init__(self, client: 'FakeRedis') -> None:
+        self.client: 'FakeRedis' = client
+        self.commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def command(*args, **kwargs) -> 'FakePipeline':
+            self.commands.append((name, args, kwargs))
+            return self
+        return command
+
+    def execute(self) -> List[Any]:
+        with self.client.lock:
+            results = [
+                getattr(self.client, name)(*args, **kwargs)
+                for name, args, kwargs in self.commands
+            ]
+        self.commands.clear()
+        return results
+
+    def __enter__(self) -> 'FakePipeline':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.commands.clear()
+
+
+class FakeRedis:
+    """In-memory stand-in for the part of redis.Redis used by the producer
+    and the consumer, to run them and benchmark them without a server"""
+    def __init__(self, decode_responses: bool = False) -> None:
+        self.decode_responses: bool = decode_responses
+        self.lists: Dict[str, Deque] = defaultdict(deque)
+        self.streams: Dict[str, FakeStream] = {}
+        self.lock: threading.RLock = threading.RLock()
+        self.changed: threading.Condition = threading.Condition(self.lock)
+
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, bytes):
+            return value.decode() if self.decode_responses else value
+        value = value if isinstance(value, str) else str(value)
+        return value if self.decode_responses else value.encode()
+
+    def key(self, name: Any) -> str:
+        return name.decode() if isinstance(name, bytes) else name
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def lpush(self, name: str, *values: Any) -> int:
+        with self.changed:
+            items = self.lists[self.key(name)]
+            items.extendleft(self.encode(value) for value in values)
+            self.changed.notify_all()
+            return len(items)
+
+    def rpush(self, name: str, *values: Any) -> int:
+        with self.changed:
+            items = self.lists[self.key(name)]
+            items.extend(self.encode(value) for value in values)
+            self.changed.notify_all()
+            return len(items)
+
+    def llen(self, name: str) -> int:
+        with self.lock:
+            return len(self.lists[self.key(name)])
+
+    def rpop(self, name: str, count: int | None = None) -> Any:
+        with self.lock:
+            items = self.lists[self.key(name)]
+            if count is None:
+                return items.pop() if items else None
+            if not items:
+                return None
+            return [items.pop() for _ in range(min(count, len(items)))]
+
+    def lpop(self, name: str, count: int | None = None) -> Any:
+        with self.lock:
+            items = self.lists[self.key(name)]
+            if count is None:
+                return items.popleft() if items else None
+            if not items:
+                return None
+            return [items.popleft() for _ in range(min(count, len(items)))]
+
+    def lmpop(self, num_keys: int, *args: Any, direction: str, count: int = 1) -> Any:
+        with self.lock:
+            for name in args[:num_keys]:
+                if self.lists[self.key(name)]:
+                    pop = self.rpop if direction.upper() == 'RIGHT' else self.lpop
+                    return [self.encode(name), pop(name, count)]
+            return None
+
+    def brpop(self, keys: Any, timeout: float = 0) -> Any:
+        keys = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        deadline: float | None = monotonic() + timeout if timeout else None
+        with self.changed:
+            while True:
+                for name in keys:
+                    items = self.lists[self.key(name)]
+                    if items:
+                        return self.encode(name), items.pop()
+                remaining: float | None = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.changed.wait(remaining)
+
+    def delete(self, *names: str) -> int:
+        with self.lock:
+            deleted: int = 0
+            for name in names:
+                deleted += bool(self.lists.pop(self.key(name), None))
+                deleted += bool(self.streams.pop(self.key(name), None))
+            return deleted
+
+    def encode_id(self, stream_id: Tuple[int, int]) -> Any:
+        return self.encode(f'{stream_id[0]}-{stream_id[1]}')
+
+    def encode_entry(self, stream_id: Tuple[int, int], fields: Dict) -> Tuple[Any, Dict]:
+        return self.encode_id(stream_id), {
+            self.encode(field): self.encode(value) for field, value in fields.items()
+        }
+
+    def group(self, name: str, groupname: str) -> Tuple[FakeStream, FakeGroup]:
+        stream = self.streams.get(self.key(name))
+        group = None if stream is None else stream.groups.get(self.key(groupname))
+        if group is None:
+            raise ResponseError(f'NOGROUP No such key {name!r} or consumer group {groupname!r}')
+        return stream, group
+
+    def xadd(self, name: str, fields: Dict, id: str = '*', maxlen: int | None = None,
+             approximate: bool = True) -> Any:
+        with self.changed:
+            stream = self.streams.setdefault(self.key(name), FakeStream())
+            if id == '*':
+                milliseconds: int = max(int(time() * 1000), stream.last_id[0])
+                sequence: int = stream.last_id[1] + 1 if milliseconds == stream.last_id[0] else 0
+                stream_id: Tuple[int, int] = (milliseconds, sequence)
+            else:
+                stream_id = parse_id(id)
+                if stream_id <= stream.last_id:
+                    raise ResponseError('ERR The ID specified in XADD is equal or smaller than the target stream top item')
+            stream.entries[stream_id] = dict(fields)
+            stream.ids.append(stream_id)
+            stream.last_id = stream_id
+            if maxlen is not None and len(stream.ids) > maxlen:
+                for old_id in stream.ids[:len(stream.ids) - maxlen]:
+                    del stream.entries[old_id]
+                del stream.ids[:len(stream.ids) - maxlen]
+            self.changed.notify_all()
+            return self.encode_id(stream_id)
+
+    def xlen(self, name: str) -> int:
+        with self.lock:
+            stream = self.streams.get(self.key(name))
+            return 0 if stream is None else len(stream.entries)
+
+    def xgroup_create(self, name: str, groupname: str, id: str = '$', mkstream: bool = False) -> bool:
+        with self.lock:
+            stream = self.streams.get(self.key(name))
+            if stream is None:
+                if not mkstream:
+                    raise ResponseError('ERR The XGROUP subcommand requires the key to exist')
+                stream = self.streams[self.key(name)] = FakeStream()
+            if self.key(groupname) in stream.groups:
+                raise ResponseError('BUSYGROUP Consumer Group name already exists')
+            last_id: Tuple[int, int] = stream.last_id if id == '$' else parse_id(id)
+            stream.groups[self.key(groupname)] = FakeGroup(last_id)
+            return True
+
+    def xreadgroup(self, groupname: str, consumername: str, streams: Dict,
+                   count: int | None = None, block: int | None = None, noack: bool = False) -> List:
+        deadline: float | None = None if block is None else monotonic() + block / 1000
+        with self.changed:
+            while True:
+                result: List = []
+                for name, start in streams.items():
+                    stream, group = self.group(name, groupname)
+                    if self.key(start) == '>':
+                        first: int = bisect_right(stream.ids, group.last_id)
+                        ids = stream.ids[first:first + count if count else None]
+                        if ids:
+                            group.last_id = ids[-1]
+                        if not noack:
+                            now: int = int(time() * 1000)
+                            for stream_id in ids:
+                                group.pending[stream_id] = [self.key(consumername), now, 1]
+                    else:
+                        ids = sorted(
+                            i for i, (owner, _, _) in group.pending.items()
+                            if owner == self.key(consumername) and i > parse_id(start)
+                        )[:count]
+                    entries = [
+                        self.encode_entry(i, stream.entries[i]) for i in ids if i in stream.entries
+                    ]
+                    if entries or self.key(start) != '>':
+                        result.append([self.encode(name), entries])
+                if result or deadline is None:
+                    return result
+                remaining: float = deadline - monotonic()
+                if block and remaining <= 0:
+                    return result
+                self.changed.wait(remaining if block else None)
+
+    def xack(self, name: str, groupname: str, *ids: Any) -> int:
+        with self.lock:
+            _, group = self.group(name, groupname)
+            return sum(group.pending.pop(parse_id(i), None) is not None for i in ids)
+
+    def xpending(self, name: str, groupname: str) -> Dict:
+        with self.lock:
+            _, group = self.group(name, groupname)
+            consumers = defaultdict(int)
+            for owner, _, _ in group.pending.values():
+                consumers[owner] += 1
+            ids = sorted(group.pending)
+            return {
+                'pending': len(ids),
+                'min': self.encode_id(ids[0]) if ids else None,
+                'max': self.encode_id(ids[-1]) if ids else None,
+                'consumers': [
+                    {'name': self.encode(owner), 'pending': number} for owner, number in consumers.items()
+                ],
+            }
+
+    def xautoclaim(self, name: str, groupname: str, consumername: str, min_idle_time: int,
+                   start_id: str = '0-0', count: int | None = None, justid: bool = False) -> List:
+        with self.lock:
+            stream, group = self.group(name, groupname)
+            now: int = int(time() * 1000)
+            start: Tuple[int, int] = parse_id(start_id)
+            claimed: List = []
+            deleted: List = []
+            for stream_id in sorted(group.pending):
+                if stream_id < start or now - group.pending[stream_id][1] < min_idle_time:
+                    continue
+                if len(claimed) == (count or 100):
+                    return [self.encode_id(stream_id), claimed, deleted]
+                if stream_id not in stream.entries:
+                    del group.pending[stream_id]
+                    deleted.append(self.encode_id(stream_id))
+                    continue
+                group.pending[stream_id] = [self.key(consumername), now, group.pending[stream_id][2] + 1]
+                claimed.append(
+                    self.encode_id(stream_id) if justid
+                    else self.encode_entry(stream_id, stream.entries[stream_id])
+                )
+            return [self.encode('0-0'), claimed, deleted]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'FakeRedis':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class FakeAsyncPipeline:
+    def __init__(self, pipeline: FakePipeline) -> None:
+        self.pipeline: FakePipeline = pipeline
+
+    def __getattr__(self, name: str):
+        def command(*args, **kwargs) -> 'FakeAsyncPipeline':
+            getattr(self.pipeline, name)(*args, **kwargs)
+            return self
+        return command
+
+    async def execute(self) -> List[Any]:
+        return self.pipeline.execute()
+
+    async def __aenter__(self) -> 'FakeAsyncPipeline':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.pipeline.commands.clear()
+
+
+class FakeAsyncRedis:
+    """The same in-memory data behind the interface of redis.asyncio.Redis,
+    blocking commands poll instead of holding the event loop"""
+    def __init__(self, client: FakeRedis | None = None, decode_responses: bool = False) -> None:
+        self.client: FakeRedis = client or FakeRedis(decode_responses)
+
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+
+        async def command(*args, **kwargs):
+            return method(*args, **kwargs)
+        return command
+
+    def pipeline(self, transaction: bool = True) -> FakeAsyncPipeline:
+        return FakeAsyncPipeline(self.client.pipeline(transaction))
+
+    async def brpop(self, keys: Any, timeout: float = 0) -> Any:
+        deadline: float | None = monotonic() + timeout if timeout else None
+        while True:
+            popped = self.client.brpop(keys, timeout=0.000001)
+            if popped is not None or (deadline is not None and monotonic() >= deadline):
+                return popped
+            await asyncio.sleep(0.005)
+
+    async def aclose(self) -> None:
+        self.client.close()
+
+    async def __aenter__(self) -> 'FakeAsyncRedis':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
@@ -1,11 +1,15 @@
 import redis
 import random
 from typing import List, Any, Dict, Tuple
+import argparse
 import json
-from time import sleep
+from time import sleep, monotonic
 import logging
 
 
+QUEUE: str = 'transactions'
+
+
 ACCOUNTS: List[int | Any] = [
     1111111111,
     2222222222,
@@ -30,11 +34,63 @@ def push_transactions(redis_client) -> None:
         if not is_valid_transaction(transaction):
             logging.error(transaction)
             continue
-        redis_client.lpush('transactions', json.dumps(transaction))
+        redis_client.lpush(QUEUE, json.dumps(transaction))
         logging.info(transaction)
         sleep(1)
 
 
+def get_transactions(count: int) -> List[Dict]:
+    """count random transactions, the invalid ones are dropped"""
+    senders: List[Any] = random.choices(ACCOUNTS, k=count)
+    receivers: List[Any] = random.choices(ACCOUNTS, k=count)
+    transactions: List[Dict] = [
+        {
+            "metadata": {
+                "from": sender,
+                "to": receiver,
+            },
+            "amount": random.randint(-10000, 10000),
+        }
+        for sender, receiver in zip(senders, receivers)
+    ]
+    return [transaction for transaction in transactions if is_valid_transaction(transaction)]
+
+
+def encode_json(transaction: Dict) -> bytes:
+    # the same bytes as codec.JSON, which isn't needed for a JSON producer
+    return json.dumps(transaction, separators=(',', ':')).encode()
+
+
+def push_batch(redis_client, transactions: List[Dict], codec=None) -> None:
+    pipeline = redis_client.pipeline(transaction=False)
+    pipeline.lpush(QUEUE, *map(encode_json if codec is None else codec.encode, transactions))
+    pipeline.execute()
+
+
+def push_transactions_fast(redis_client,
+                           batch_size: int = 1000,
+                           rate: float | None = None,
+                           total: int | None = None,
+                           codec=None) -> int:
+    """Push batches of valid transactions through a pipeline, rate is the
+    target number of messages per second, None means as fast as possible"""
+    pushed: int = 0
+    start: float = monotonic()
+    while total is None or pushed < total:
+        size: int = batch_size if total is None else min(batch_size, total - pushed)
+        transactions: List[Dict] = get_transactions(size)
+        while len(transactions) < size:
+            transactions += get_transactions(size - len(transactions))
+        push_batch(redis_client, transactions, codec)
+        pushed += size
+        logging.debug(f'{pushed} transactions pushed')
+        if rate:
+            delay: float = start + pushed / rate - monotonic()
+            if delay > 0:
+                sleep(delay)
+    return pushed
+
+
 def is_valid_transaction(transaction: Dict) -> bool:
     if (transaction['metadata']['from'] == transaction['metadata']['to']
         or len(str(transaction['metadata']['from'])) != 10
@@ -63,7 +119,50 @@ def get_transaction() -> Dict:
     }
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fast', action='store_true', help='Push batches through a pipeline without sleeping')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--rate', type=float, help='Target messages per second for --fast')
+    parser.add_argument('--count', type=int, help='Stop after this number of messages for --fast')
+    parser.add_argument('--fake', action='store_true', help='Use in-memory FakeRedis instead of a server, implies --fast')
+    parser.add_argument('--codec', default='json', help='Wire format for --fast: json, struct or msgpack')
+    args = parser.parse_args()
+    # the fake backend never falls back to a real server
+    args.fast = args.fast or args.fake
+    if not args.fast:
+        used = [flag for flag, value, default in (
+            ('--batch-size', args.batch_size, 1000),
+            ('--rate', args.rate, None),
+            ('--count', args.count, None),
+            ('--codec', args.codec, 'json'),
+        ) if value != default]
+        if used:
+            parser.error(f'{", ".join(used)} requires --fast')
+    return args
+
+
 if __name__ == '__main__':
-    logging.basicConfig(level=logging.DEBUG)
-    with redis.Redis() as redis_client:
-        push_transactions(redis_client)
+    args = parse_args()
+    if not args.fast:
+        logging.basicConfig(level=logging.DEBUG)
+        with redis.Redis() as redis_client:
+            push_transactions(redis_client)
+    else:
+        logging.basicConfig(level=logging.INFO)
+        if args.fake and args.count is None:
+            args.count = 1_000_000
+        # imported here, so the producer alone is enough for the JSON deployment
+        codec = None
+        if args.codec != 'json':
+            from codec import get_codec
+            codec = get_codec(args.codec)
+        if args.fake:
+            from fake_redis import FakeRedis
+        with (FakeRedis() if args.fake else redis.Redis()) as redis_client:
+            start: float = monotonic()
+            pushed: int = push_transactions_fast(
+                redis_client, args.batch_size, args.rate, args.count, codec,
+            )
+            elapsed: float = monotonic() - start
+            logging.info(f'{pushed} transactions in {elapsed:.2f}s, {pushed / elapsed:,.0f} messages/s')
@@ -0,0 +1,199 @@
+import redis
+import redis.exceptions
+from typing import List, Dict, Any, Tuple, FrozenSet
+from threading import Thread
+from time import time, monotonic
+import argparse
+import json
+import logging
+
+from consumer import reverse_transaction
+from producer import get_transactions
+
+
+STREAM: str = 'transactions:stream'
+GROUP: str = 'consumers'
+# entries not acknowledged for this long are taken over from a dead consumer
+MIN_IDLE_TIME: int = 30_000
+# a running consumer also takes them over after this many batches
+RECOVER_EVERY: int = 100
+
+
+def ensure_group(redis_client, stream: str = STREAM, group: str = GROUP) -> None:
+    try:
+        redis_client.xgroup_create(stream, group, id='0', mkstream=True)
+    except redis.exceptions.ResponseError as error:
+        if 'BUSYGROUP' not in str(error):
+            raise
+
+
+def push_stream(redis_client,
+                transactions: List[Dict],
+                stream: str = STREAM,
+                maxlen: int | None = None) -> List:
+    """XADD every transaction in one pipeline, the time of sending is kept
+    in the entry to measure the latency on the consumer side"""
+    pipeline = redis_client.pipeline(transaction=False)
+    sent: float = time()
+    for transaction in transactions:
+        pipeline.xadd(stream, {'data': json.dumps(transaction), 'sent': sent}, maxlen=maxlen)
+    return pipeline.execute()
+
+
+def decode_entries(entries: List[Tuple[Any, Dict]]) -> Tuple[List[Any], List[Dict], List[float]]:
+    ids: List[Any] = []
+    transactions: List[Dict] = []
+    sent: List[float] = []
+    for entry_id, fields in entries:
+        ids.append(entry_id)
+        transactions.append(json.loads(fields.get(b'data', fields.get('data'))))
+        sent.append(float(fields.get(b'sent', fields.get('sent', 0))))
+    return ids, transactions, sent
+
+
+def read_batch(redis_client,
+               consumer: str,
+               count: int = 1000,
+               block: int | None = 1000,
+               stream: str = STREAM,
+               group: str = GROUP) -> List[Tuple[Any, Dict]]:
+    response = redis_client.xreadgroup(group, consumer, {stream: '>'}, count=count, block=block)
+    return response[0][1] if response else []
+
+
+def recover_pending(redis_client,
+                    consumer: str,
+                    min_idle_time: int = MIN_IDLE_TIME,
+                    count: int = 1000,
+                    stream: str = STREAM,
+                    group: str = GROUP) -> List[Tuple[Any, Dict]]:
+    """Entries which were read by a crashed consumer and never acknowledged"""
+    entries: List[Tuple[Any, Dict]] = []
+    start: Any = '0-0'
+    while True:
+        next_start, claimed, *_ = redis_client.xautoclaim(
+            stream, group, consumer, min_idle_time, start_id=start, count=count,
+        )
+        entries += claimed
+        start = next_start.decode() if isinstance(next_start, bytes) else next_start
+        if start == '0-0':
+            return entries
+
+
+def handle_entries(redis_client,
+                   entries: List[Tuple[Any, Dict]],
+                   bad_accounts: FrozenSet[int],
+                   stream: str = STREAM,
+                   group: str = GROUP) -> List[float]:
+    """Reverse the bad transactions and acknowledge the whole batch,
+    returns the latency of every entry in seconds"""
+    ids, transactions, sent = decode_entries(entries)
+    for transaction in transactions:
+        if transaction['metadata']['to'] in bad_accounts and transaction['amount'] > 0:
+            logging.info(f'HACKED!!! {reverse_transaction(transaction)}')
+    redis_client.xack(stream, group, *ids)
+    now: float = time()
+    return [now - moment for moment in sent]
+
+
+def consume_stream(redis_client,
+                   consumer: str,
+                   bad_accounts: FrozenSet[int],
+                   count: int = 1000,
+                   block: int = 1000,
+                   min_idle_time: int = MIN_IDLE_TIME,
+                   stop_when_empty: bool = False,
+                   stream: str = STREAM,
+                   group: str = GROUP,
+                   recover_every: int = RECOVER_EVERY) -> List[float]:
+    """Pending entries of crashed consumers are recovered on start, when the
+    stream is drained and every recover_every batches, so the group doesn't
+    depend on a restart of the consumer which died"""
+    ensure_group(redis_client, stream, group)
+
+    def recover() -> List[float]:
+        pending = recover_pending(redis_client, consumer, min_idle_time, count, stream, group)
+        if not pending:
+            return []
+        logging.info(f'{consumer}: recovered {len(pending)} pending transactions')
+        return handle_entries(redis_client, pending, bad_accounts, stream, group)
+
+    latencies: List[float] = recover()
+    batches: int = 0
+    while True:
+        entries = read_batch(redis_client, consumer, count, block, stream, group)
+        if not entries:
+            recovered: List[float] = recover()
+            latencies += recovered
+            if stop_when_empty and not recovered:
+                return latencies
+            continue
+        latencies += handle_entries(redis_client, entries, bad_accounts, stream, group)
+        batches += 1
+        if batches % recover_every == 0:
+            latencies += recover()
+
+
+def benchmark(total: int, consumers: int, batch_size: int) -> None:
+    """Producer and consumers as threads around one FakeRedis"""
+    from fake_redis import FakeRedis
+    redis_client: FakeRedis = FakeRedis()
+    ensure_group(redis_client)
+    latencies: List[List[float]] = [[] for _ in range(consumers)]
+
+    def produce() -> None:
+        pushed: int = 0
+        while pushed < total:
+            transactions: List[Dict] = get_transactions(min(batch_size, total - pushed))
+            push_stream(redis_client, transactions)
+            pushed += len(transactions)
+
+    def consume(number: int) -> None:
+        latencies[number] = consume_stream(
+            redis_client, f'consumer-{number}', frozenset(), batch_size, block=200, stop_when_empty=True,
+        )
+
+    start: float = monotonic()
+    threads: List[Thread] = [Thread(target=produce)]
+    threads += [Thread(target=consume, args=(number,)) for number in range(consumers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed: float = monotonic() - start
+    merged: List[float] = sorted(latency for part in latencies for latency in part)
+    assert len(merged) == total and redis_client.xpending(STREAM, GROUP)['pending'] == 0
+    print(f'{total} transactions, {consumers} consumers: {total / elapsed:,.0f} messages/s, '
+          f'latency p50 {merged[len(merged) // 2] * 1000:.1f}ms, '
+          f'p99 {merged[int(len(merged) * 0.99)] * 1000:.1f}ms')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('mode', choices=('produce', 'consume', 'benchmark'))
+    parser.add_argument('-e', help="List of bad guys' accounts", default='')
+    parser.add_argument('--consumer', default='consumer-1', help='Name of this consumer in the group')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--count', type=int, default=100_000, help='Transactions to produce')
+    parser.add_argument('--consumers', type=int, default=4, help='Consumers for the benchmark')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.mode == 'benchmark':
+        benchmark(args.count, args.consumers, args.batch_size)
+    elif args.mode == 'produce':
+        with redis.Redis() as redis_client:
+            pushed: int = 0
+            while pushed < args.count:
+                transactions: List[Dict] = get_transactions(min(args.batch_size, args.count - pushed))
+                push_stream(redis_client, transactions)
+                pushed += len(transactions)
+    else:
+        bad_accounts: FrozenSet[int] = frozenset(
+            int(account) for account in args.e.split(',') if account
+        )
+        with redis.Redis() as redis_client:
+            consume_stream(redis_client, args.consumer, bad_accounts, args.batch_size)
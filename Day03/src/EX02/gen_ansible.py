@@ -1,3 +1,8 @@
+from typing import Dict, List, Any, Iterable
+import argparse
+import hashlib
+import json
+import re
 import yaml
 import os
 
@@ -6,52 +11,167 @@ start_path: str = os.path.dirname(__file__) + '/'
 materaials_path: str = os.path.join(start_path, '../../materials/')
 ex00_path: str = os.path.join(start_path, '../EX00/')
 ex01_path: str = os.path.join(start_path, '../EX01/')
-with open(materaials_path + 'todo.yml', 'r') as file:
-    todo = yaml.load(file, yaml.FullLoader)
-deploy = [{
-    'name': 'Playbook',
-    'hosts': 'localhost',
-    'become': 'yes',
-    'tasks': [
-        {
-            'name': 'Installation packeges',
-            'ansible.builtin.apt': {
-                'name': '{{ item }}'
-            },
-            'loop': todo['server']['install_packages'],
-        },
-        {
-            'name': 'Copying files',
-            'ansible.builtin.copy': {
-                'src': '{{ item.src }}',
-                'dest': '{{ item.dest }}',
-            },
-            'loop': [
-                {
-                    'src': ex00_path + 'exploit.py',
-                    'dest': start_path + 'exploit.py',
-                },
-                {
-                    'src': ex01_path + 'consumer.py',
-                    'dest': start_path + 'consumer.py'
+
+# libyaml bindings are much faster, the pure python classes are the fallback
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+Dumper = getattr(yaml, 'CDumper', yaml.Dumper)
+
+HASH_PREFIX: str = '# inputs sha256: '
+HOST_PLACEHOLDER: str = '__deploy_host__'
+
+
+def build_playbook(todo: Dict, hosts: str = 'localhost') -> List[Dict]:
+    return [{
+        'name': 'Playbook',
+        'hosts': hosts,
+        'become': 'yes',
+        'tasks': [
+            {
+                'name': 'Installation packeges',
+                'ansible.builtin.apt': {
+                    'name': '{{ item }}'
                 },
-            ]
-        },
-        {
-            'name': 'Run files',
-            'ansible.builtin.shell': {
-                'cmd': '{{ item.cmd }}',
+                'loop': todo['server']['install_packages'],
             },
-            'loop': [
-                {
-                    'cmd': 'python3 exploit.py',
+            {
+                'name': 'Copying files',
+                'ansible.builtin.copy': {
+                    'src': '{{ item.src }}',
+                    'dest': '{{ item.dest }}',
                 },
-                {
-                    'cmd': 'python3 consumer.py -e ' + ','.join(todo['bad_guys'])
+                'loop': [
+                    {
+                        'src': ex00_path + 'exploit.py',
+                        'dest': start_path + 'exploit.py',
+                    },
+                    {
+                        'src': ex01_path + 'consumer.py',
+                        'dest': start_path + 'consumer.py'
+                    },
+                ]
+            },
+            {
+                'name': 'Run files',
+                'ansible.builtin.shell': {
+                    'cmd': '{{ item.cmd }}',
                 },
-            ],
-        },
-    ],
-}]
-with open(start_path + 'deploy.yml', 'w') as file:
-    yaml.dump(deploy, file, sort_keys=False, default_flow_style=False)
+                'loop': [
+                    {
+                        'cmd': 'python3 exploit.py',
+                    },
+                    {
+                        'cmd': 'python3 consumer.py -e ' + ','.join(todo['bad_guys'])
+                    },
+                ],
+            },
+        ],
+    }]
+
+
+def render_template(todo: Dict) -> str:
+    """The playbook is dumped once, only the hosts line differs between targets"""
+    return yaml.dump(build_playbook(todo, HOST_PLACEHOLDER), Dumper=Dumper,
+                     sort_keys=False, default_flow_style=False)
+
+
+def render(template: str, host: str) -> str:
+    # always quoted: a JSON string is a valid YAML scalar, so hosts like
+    # 'yes', 'null' or 'web:&prod' stay strings
+    return template.replace(HOST_PLACEHOLDER, json.dumps(host), 1)
+
+
+def inputs_digest(todo_source: bytes) -> Any:
+    """The playbooks depend on the todo file, this generator and its paths"""
+    digest = hashlib.sha256(todo_source)
+    with open(__file__, 'rb') as file:
+        digest.update(file.read())
+    digest.update(start_path.encode())
+    return digest
+
+
+def inputs_hash(digest: Any, host: str) -> str:
+    digest = digest.copy()
+    digest.update(host.encode())
+    return digest.hexdigest()
+
+
+def stored_hash(path: str) -> str | None:
+    try:
+        with open(path, 'r') as file:
+            first_line: str = file.readline()
+    except FileNotFoundError:
+        return None
+    if first_line.startswith(HASH_PREFIX):
+        return first_line[len(HASH_PREFIX):].strip()
+    return None
+
+
+def output_path(output_dir: str, host: str, single: bool) -> str:
+    if single:
+        return os.path.join(output_dir, 'deploy.yml')
+    name: str = re.sub(r'[^\w.\-]', '_', host)
+    if name != host:
+        # 'web:&prod' and 'web__prod' must not share a file
+        name += '-' + hashlib.sha256(host.encode()).hexdigest()[:8]
+    return os.path.join(output_dir, f'deploy-{name}.yml')
+
+
+def generate(todo_path: str,
+             hosts: Iterable[str] = ('localhost',),
+             output_dir: str = start_path,
+             force: bool = False) -> Dict[str, bool]:
+    """Write a playbook for every target, the ones whose inputs hash matches
+    the hash in the first line of the existing playbook are skipped.
+    Returns the paths of the playbooks and whether each one was written."""
+    hosts = list(dict.fromkeys(hosts))
+    with open(todo_path, 'rb') as file:
+        todo_source: bytes = file.read()
+    base_digest = inputs_digest(todo_source)
+    template: str | None = None
+    written: Dict[str, bool] = {}
+    for host in hosts:
+        path: str = output_path(output_dir, host, len(hosts) == 1)
+        if path in written:
+            raise ValueError(f'Two targets share the playbook {path}')
+        digest: str = inputs_hash(base_digest, host)
+        if not force and stored_hash(path) == digest:
+            written[path] = False
+            continue
+        if template is None:
+            template = render_template(yaml.load(todo_source, Loader))
+        with open(path, 'w') as file:
+            file.write(f'{HASH_PREFIX}{digest}\n')
+            file.write(render(template, host))
+        written[path] = True
+    return written
+
+
+def read_hosts(paths: List[str]) -> List[str]:
+    """Hosts or groups one per line, empty lines and comments are skipped"""
+    hosts: List[str] = []
+    for path in paths:
+        with open(path, 'r') as file:
+            for line in file:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    hosts.append(line)
+    return hosts
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--todo', default=materaials_path + 'todo.yml')
+    parser.add_argument('--hosts', nargs='+', default=[],
+                        help='Hosts or inventory groups, a playbook is generated for each one')
+    parser.add_argument('--hosts-file', nargs='+', default=[], help='Files with a host or group per line')
+    parser.add_argument('--output-dir', default=start_path)
+    parser.add_argument('--force', action='store_true', help='Regenerate even if the inputs are unchanged')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    targets: List[str] = args.hosts + read_hosts(args.hosts_file) or ['localhost']
+    result: Dict[str, Any] = generate(args.todo, targets, args.output_dir, args.force)
+    skipped: int = sum(not value for value in result.values())
+    print(f'{len(result) - skipped} playbooks written, {skipped} unchanged')
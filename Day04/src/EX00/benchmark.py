@@ -0,0 +1,54 @@
+import sys
+import tracemalloc
+from collections import deque
+from itertools import chain, repeat
+from time import time
+from typing import Iterator
+
+import energy
+
+
+def column(name: str, size: int, junk_every: int = 10) -> Iterator:
+    """size strings with a non-string entry after every junk_every of them"""
+    for number in range(size):
+        if number % junk_every == 0:
+            yield None
+        yield f'{name}{number}'
+
+
+def plug_column(size: int) -> Iterator:
+    """Plugs run out before the cables, so a part of the cables is welded"""
+    return chain(column('plug', size * 3 // 4), repeat(42, 10))
+
+
+def run(fix_wiring, cables: list, sockets: list, plugs: list) -> float:
+    start = time()
+    deque(fix_wiring(cables, sockets, plugs), maxlen=0)
+    return time() - start
+
+
+def peak_memory(fix_wiring, size: int) -> int:
+    """The columns are generators here, nothing but the chunks is kept"""
+    tracemalloc.start()
+    deque(fix_wiring(column('cable', size), column('socket', size), plug_column(size)), maxlen=0)
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == '__main__':
+    size: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    check: int = 10_000
+    assert list(energy.fix_wiring_bulk(column('cable', check), column('socket', check), plug_column(check))) == \
+        list(energy.fix_wiring(list(column('cable', check)), list(column('socket', check)), list(plug_column(check))))
+
+    columns = list(column('cable', size)), list(column('socket', size)), list(plug_column(size))
+    time_old: float = run(energy.fix_wiring, *columns)
+    time_bulk: float = run(energy.fix_wiring_bulk, *columns)
+    del columns
+    print(f'fix_wiring():       {size / time_old:>12,.0f} instructions/s')
+    print(f'fix_wiring_bulk():  {size / time_bulk:>12,.0f} instructions/s')
+    print(f'=> fix_wiring_bulk() faster than fix_wiring() in {time_old / time_bulk:.1f} times')
+    for number in (size // 10, size):
+        print(f'peak memory of fix_wiring_bulk() for {number:,} cables: '
+              f'{peak_memory(energy.fix_wiring_bulk, number) / 1024:,.0f} KiB')
@@ -1,5 +1,12 @@
-from typing import List, Any, Iterator
-from itertools import zip_longest, starmap
+from typing import List, Any, Iterator, Iterable
+from itertools import zip_longest, starmap, islice, chain
+
+
+CHUNK_SIZE: int = 4096
+PLUG: str = 'plug {} into {} using {}'
+WELD: str = 'weld {} to {} without plug'
+# isinstance(x, str) as a C function, no lambda call for every element
+is_string = str.__instancecheck__
 
 
 def fix_wiring(cabels: List, sockets: List, plugs: List) -> Iterator[str]:
@@ -19,6 +26,47 @@ def fix_wiring(cabels: List, sockets: List, plugs: List) -> Iterator[str]:
     )
 
 
+def read_column(path: str) -> Iterator[str]:
+    """Lines of the file without the line break, one entry per line"""
+    with open(path, 'r') as file:
+        for line in file:
+            yield line.rstrip('\n')
+
+
+def fix_wiring_chunks(cabels: Iterable,
+                      sockets: Iterable,
+                      plugs: Iterable,
+                      chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """Same instructions as fix_wiring() by lists of chunk_size, any iterables
+    are read lazily so the memory doesn't depend on the length of the input"""
+    cabels = filter(is_string, cabels)
+    sockets = filter(is_string, sockets)
+    plugs = filter(is_string, plugs)
+    while True:
+        cabel_chunk: List[str] = list(islice(cabels, chunk_size))
+        socket_chunk: List[str] = list(islice(sockets, len(cabel_chunk)))
+        size: int = len(socket_chunk)
+        plug_chunk: List[str] = list(islice(plugs, size))
+        if len(plug_chunk) == size and all(plug_chunk):
+            chunk: List[str] = list(map(PLUG.format, cabel_chunk, socket_chunk, plug_chunk))
+        else:
+            chunk = [
+                PLUG.format(cabel, socket, plug) if plug else WELD.format(cabel, socket)
+                for cabel, socket, plug in zip_longest(cabel_chunk[:size], socket_chunk, plug_chunk)
+            ]
+        if chunk:
+            yield chunk
+        if size < chunk_size:
+            return
+
+
+def fix_wiring_bulk(cabels: Iterable,
+                    sockets: Iterable,
+                    plugs: Iterable,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    return chain.from_iterable(fix_wiring_chunks(cabels, sockets, plugs, chunk_size))
+
+
 def tests() -> None:
     assert list(fix_wiring(
         plugs=['plug1', 'plug2', 'plug3'],
@@ -45,6 +93,21 @@ def tests() -> None:
     )) == [
         'plug cable2 into socket1 using plugZ',
     ]
+    plugs = ['plugZ', None, '', 'plugY']
+    sockets = [1, 'socket1', 'socket2', 'socket3', 'socket4', 'socket5']
+    cabels = ['cable1', False, 'cable2', 'cable3', 'cable4', 'cable5']
+    for chunk_size in (1, 2, 3, 4, 100):
+        assert list(fix_wiring_bulk(iter(cabels), iter(sockets), iter(plugs), chunk_size)) == \
+            list(fix_wiring(cabels, sockets, plugs))
+    assert list(fix_wiring_bulk(iter(cabels), iter(sockets), iter(plugs))) == [
+        'plug cable1 into socket1 using plugZ',
+        'weld cable2 to socket2 without plug',
+        'plug cable3 into socket3 using plugY',
+        'weld cable4 to socket4 without plug',
+        'weld cable5 to socket5 without plug',
+    ]
+    assert [len(chunk) for chunk in fix_wiring_chunks(cabels, sockets, plugs, 2)] == [2, 2, 1]
+    assert list(fix_wiring_bulk([], sockets, plugs)) == []
     print('Tests passed!!!')
 
 
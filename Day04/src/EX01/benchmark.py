@@ -0,0 +1,75 @@
+import sys
+import tracemalloc
+from itertools import islice
+from time import time
+
+import personality
+
+
+def spawn_rate(spawn, n: int) -> float:
+    start = time()
+    turrets = spawn(n)
+    elapsed: float = time() - start
+    assert len(turrets) == n
+    return n / elapsed
+
+
+def bytes_per_turret(spawn, n: int) -> float:
+    tracemalloc.start()
+    turrets = spawn(n)
+    size: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del turrets
+    return size / n
+
+
+def class_per_turret(n: int) -> list:
+    return list(islice(personality.turrets_generator(), n))
+
+
+def cached_class(n: int) -> list:
+    return list(islice(personality.turrets_generator(cached=True), n))
+
+
+def bench_fleet(n: int) -> None:
+    start = time()
+    fleet = personality.TurretFleet.spawn(n, seed=427)
+    rate: float = n / (time() - start)
+    size: int = sum(fleet.column(trait).buffer_info()[1] for trait in personality.TRAITS)
+    print(f'{"TurretFleet.spawn():":<32}{rate:>12,.0f} turrets/s, {size / n:>8,.0f} bytes/turret')
+    start = time()
+    extraverts = fleet.where('extraversion', '>', 40)
+    where_time: float = time() - start
+    start = time()
+    indices = fleet.indices(extraverts)
+    indices_time: float = time() - start
+    start = time()
+    both = fleet.both(extraverts, fleet.where('neuroticism', '<', 10))
+    both_time: float = time() - start
+    start = time()
+    stats = fleet.stats('openness')
+    stats_time: float = time() - start
+    start = time()
+    loop = [i for i, value in enumerate(fleet.extraversion) if value > 40]
+    loop_time: float = time() - start
+    assert loop == indices
+    print(f'where(extraversion > 40):       {where_time * 1000:>8.1f} ms, {fleet.count(extraverts):,} turrets')
+    print(f'indices():                      {indices_time * 1000:>8.1f} ms')
+    print(f'python loop over the column:    {loop_time * 1000:>8.1f} ms')
+    print(f'both(..., neuroticism < 10):    {both_time * 1000:>8.1f} ms, {fleet.count(both):,} turrets')
+    print(f'stats(openness):                {stats_time * 1000:>8.1f} ms, {stats}')
+
+
+if __name__ == '__main__':
+    n: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    fleet_n: int = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000
+    memory_n: int = min(n // 10, 10_000)
+    modes = (
+        ('turrets_generator()', class_per_turret, n // 10),
+        ('turrets_generator(cached=True)', cached_class, n),
+        ('spawn()', personality.spawn, n),
+    )
+    for name, spawn, count in modes:
+        print(f'{name + ":":<32}{spawn_rate(spawn, count):>12,.0f} turrets/s, '
+              f'{bytes_per_turret(spawn, memory_n):>8,.0f} bytes/turret')
+    bench_fleet(fleet_n)
@@ -1,8 +1,48 @@
+import operator
 import random
-from typing import Dict, List, Iterator
+from array import array
+from itertools import compress, repeat
+from typing import Dict, List, Iterator, Iterable, Tuple
 
 
-def turrets_generator() -> Iterator:
+TRAITS: Tuple[str, ...] = (
+    'neuroticism', 'openness', 'conscientiousness', 'extraversion', 'agreeableness',
+)
+CUTS: range = range(101)
+SPAWN_CHUNK: int = 1 << 16
+OPERATORS: Dict[str, object] = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt,
+    '<=': operator.le, '==': operator.eq, '!=': operator.ne,
+}
+
+
+def _init(self, neuroticism: int, openness: int, conscientiousness: int,
+          extraversion: int, agreeableness: int) -> None:
+    self.neuroticism = neuroticism
+    self.openness = openness
+    self.conscientiousness = conscientiousness
+    self.extraversion = extraversion
+    self.agreeableness = agreeableness
+
+
+def _repr(self) -> str:
+    traits: str = ', '.join(f'{trait}={getattr(self, trait)}' for trait in TRAITS)
+    return f'Turret({traits})'
+
+
+# one class for all the turrets, the instances keep only five slots
+Turret = type('Turret', (object, ), {
+    '__slots__': TRAITS,
+    '__init__': _init,
+    '__repr__': _repr,
+    'shoot': lambda self: print('Shooting'),
+    'search': lambda self: print('Searching'),
+    'talk': lambda self: print('Talking'),
+})
+
+
+def turrets_generator(cached: bool = False) -> Iterator:
+    """A new class for every turret, or instances of Turret if cached"""
     def generate_personality() -> Dict[str, int]:
         values: List[int] = []
         curr_sum: int = 0
@@ -27,6 +67,9 @@ def turrets_generator() -> Iterator:
     def talk() -> None:
         print('Talking')
 
+    if cached:
+        while True:
+            yield Turret(*generate_personality().values())
     while True:
         turret = type('Turret', (object, ), {
             'shoot': shoot,
@@ -36,6 +79,155 @@ def turrets_generator() -> Iterator:
         yield turret
 
 
+def spawn(n: int, seed: int | None = None) -> List:
+    """n turrets at once, the four cut points of every turret are drawn by
+    one choices() call and split 0..100 into five traits"""
+    rand = random.Random(seed)
+    cuts: Iterator[int] = iter(rand.choices(CUTS, k=4 * n))
+    turrets: List = []
+    append = turrets.append
+    for points in zip(cuts, cuts, cuts, cuts):
+        first, second, third, fourth = sorted(points)
+        append(Turret(first, second - first, third - second, fourth - third, 100 - fourth))
+    return turrets
+
+
+class TurretView:
+    """Turret interface over one element of a fleet"""
+    __slots__ = ('fleet', 'index')
+
+    def __init__(self, fleet: 'TurretFleet', index: int) -> None:
+        self.fleet = fleet
+        self.index = index
+
+    def __getattr__(self, name: str) -> int:
+        if name in TRAITS:
+            return getattr(self.fleet, name)[self.index]
+        raise AttributeError(name)
+
+    def __repr__(self) -> str:
+        return _repr(self)
+
+    def shoot(self) -> None:
+        print('Shooting')
+
+    def search(self) -> None:
+        print('Searching')
+
+    def talk(self) -> None:
+        print('Talking')
+
+
+class TurretFleet:
+    """Traits of many turrets as parallel arrays of unsigned bytes.
+
+    Queries return masks, bytes of 0 and 1 with a byte for every turret,
+    a comparison is one bytes.translate() over the whole column.
+    """
+    __slots__ = TRAITS
+
+    def __init__(self) -> None:
+        for trait in TRAITS:
+            setattr(self, trait, array('B'))
+
+    @classmethod
+    def from_turrets(cls, turrets: Iterable) -> 'TurretFleet':
+        fleet = cls()
+        for turret in turrets:
+            fleet.append(turret)
+        return fleet
+
+    @classmethod
+    def spawn(cls, n: int, seed: int | None = None) -> 'TurretFleet':
+        """Same traits as spawn(n, seed) without creating the turrets"""
+        fleet = cls()
+        rand = random.Random(seed)
+        columns = tuple(getattr(fleet, trait).append for trait in TRAITS)
+        neuroticism, openness, conscientiousness, extraversion, agreeableness = columns
+        for start in range(0, n, SPAWN_CHUNK):
+            cuts: Iterator[int] = iter(rand.choices(CUTS, k=4 * min(SPAWN_CHUNK, n - start)))
+            for points in zip(cuts, cuts, cuts, cuts):
+                first, second, third, fourth = sorted(points)
+                neuroticism(first)
+                openness(second - first)
+                conscientiousness(third - second)
+                extraversion(fourth - third)
+                agreeableness(100 - fourth)
+        return fleet
+
+    def append(self, turret) -> None:
+        for trait in TRAITS:
+            getattr(self, trait).append(getattr(turret, trait))
+
+    def __len__(self) -> int:
+        return len(self.neuroticism)
+
+    def __getitem__(self, index: int) -> TurretView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('turret index out of range')
+        return TurretView(self, index)
+
+    def __iter__(self) -> Iterator[TurretView]:
+        return map(TurretView, repeat(self), range(len(self)))
+
+    def column(self, trait: str) -> array:
+        if trait not in TRAITS:
+            raise ValueError(f'Unknown trait {trait!r}, available: {", ".join(TRAITS)}')
+        return getattr(self, trait)
+
+    def where(self, trait: str, op: str, value: int) -> bytes:
+        """Mask of the turrets for which `trait op value` holds"""
+        compare = OPERATORS.get(op)
+        if compare is None:
+            raise ValueError(f'Unknown operator {op!r}, available: {", ".join(OPERATORS)}')
+        table: bytes = bytes(compare(byte, value) for byte in range(256))
+        return self.column(trait).tobytes().translate(table)
+
+    @staticmethod
+    def both(first: bytes, second: bytes) -> bytes:
+        return (int.from_bytes(first, 'little') & int.from_bytes(second, 'little')).to_bytes(len(first), 'little')
+
+    @staticmethod
+    def either(first: bytes, second: bytes) -> bytes:
+        return (int.from_bytes(first, 'little') | int.from_bytes(second, 'little')).to_bytes(len(first), 'little')
+
+    def indices(self, mask: bytes) -> List[int]:
+        return list(compress(range(len(self)), mask))
+
+    def select(self, mask: bytes) -> List[TurretView]:
+        return [TurretView(self, index) for index in compress(range(len(self)), mask)]
+
+    @staticmethod
+    def count(mask: bytes) -> int:
+        return mask.count(1)
+
+    def histogram(self, trait: str) -> List[int]:
+        """Number of turrets with every value of the trait from 0 to 100"""
+        data: bytes = self.column(trait).tobytes()
+        return [data.count(value) for value in CUTS]
+
+    def stats(self, trait: str) -> Dict[str, float]:
+        histogram: List[int] = self.histogram(trait)
+        total: int = len(self)
+        if not total:
+            raise ValueError('Empty fleet')
+        present: List[int] = [value for value in CUTS if histogram[value]]
+        median_position: int = (total - 1) // 2
+        seen: int = 0
+        for value in present:
+            seen += histogram[value]
+            if seen > median_position:
+                break
+        return {
+            'min': present[0],
+            'max': present[-1],
+            'mean': sum(value * count for value, count in enumerate(histogram)) / total,
+            'median': value,
+        }
+
+
 def tests() -> None:
     def count_turret_fields(turret) -> int:
         return (
@@ -68,7 +260,61 @@ def tests() -> None:
             print(f'Sum turret fields: {count_turret_fields(turret)}\n')
             turret = next(turrets)
 
+    def test_2() -> None:
+        print('\nTEST 2\n')
+        turrets = turrets_generator(cached=True)
+        first, second = next(turrets), next(turrets)
+        assert type(first) is type(second) is Turret
+        assert count_turret_fields(first) == count_turret_fields(second) == 100
+        assert not hasattr(first, '__dict__')
+        first.shoot()
+        first.search()
+        first.talk()
+        print(first)
+
+    def test_3() -> None:
+        print('\nTEST 3\n')
+        turrets = spawn(10_000, seed=427)
+        assert len(turrets) == 10_000
+        assert all(type(turret) is Turret for turret in turrets)
+        assert all(count_turret_fields(turret) == 100 for turret in turrets)
+        assert all(0 <= getattr(turret, trait) <= 100 for turret in turrets for trait in TRAITS)
+        assert [repr(turret) for turret in spawn(5, seed=427)] == [repr(turret) for turret in turrets[:5]]
+        print(turrets[0])
+
+    def test_4() -> None:
+        print('\nTEST 4\n')
+        fleet = TurretFleet.spawn(10_000, seed=427)
+        turrets = spawn(10_000, seed=427)
+        assert len(fleet) == 10_000
+        assert [repr(turret) for turret in fleet] == [repr(turret) for turret in turrets]
+        assert all(count_turret_fields(turret) == 100 for turret in fleet)
+        extraverts = fleet.where('extraversion', '>', 40)
+        assert fleet.indices(extraverts) == [i for i, turret in enumerate(turrets) if turret.extraversion > 40]
+        calm = fleet.where('neuroticism', '<=', 10)
+        assert fleet.count(fleet.both(extraverts, calm)) == sum(
+            turret.extraversion > 40 and turret.neuroticism <= 10 for turret in turrets
+        )
+        assert fleet.count(fleet.either(extraverts, calm)) == sum(
+            turret.extraversion > 40 or turret.neuroticism <= 10 for turret in turrets
+        )
+        values = sorted(turret.openness for turret in turrets)
+        stats = fleet.stats('openness')
+        assert stats['min'] == values[0] and stats['max'] == values[-1]
+        assert stats['median'] == values[(len(values) - 1) // 2]
+        assert abs(stats['mean'] - sum(values) / len(values)) < 1e-9
+        assert repr(TurretFleet.from_turrets(turrets[:3])[-1]) == repr(turrets[2])
+        turret = fleet.select(extraverts)[0]
+        turret.shoot()
+        turret.search()
+        turret.talk()
+        print(turret, stats)
+        print('Tests passed!!!')
+
     test_1()
+    test_2()
+    test_3()
+    test_4()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,40 @@
+import sys
+from time import time
+from typing import Iterator
+
+import pressure
+
+
+def generator_steps(step_size: int, max_steps: int) -> int:
+    """valve() loop driving emit_gel() by send() without printing and sleeping"""
+    pressures: Iterator[int] = pressure.emit_gel(step_size)
+    current: int = next(pressures)
+    steps: int = 1
+    while 10 <= current <= 90 and steps < max_steps:
+        if current < 20:
+            step_size = abs(step_size)
+        elif current > 80:
+            step_size = -abs(step_size)
+        current = pressures.send(step_size)
+        steps += 1
+    pressures.close()
+    return steps
+
+
+if __name__ == '__main__':
+    max_steps: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    for step_size in (1, 5, 10):
+        start = time()
+        steps_generator: int = generator_steps(step_size, max_steps)
+        time_generator: float = time() - start
+        start = time()
+        steps_reference: int = len(pressure.reference_simulate(step_size, 21, max_steps))
+        time_reference: float = time() - start
+        start = time()
+        trace = pressure.simulate(step_size, 21, max_steps)
+        time_simulate: float = time() - start
+        print(f'step {step_size}:')
+        print(f'  emit_gel() by send():  {steps_generator / time_generator:>14,.0f} steps/s')
+        print(f'  reference_simulate():  {steps_reference / time_reference:>14,.0f} steps/s')
+        print(f'  simulate():            {len(trace) / time_simulate:>14,.0f} steps/s, '
+              f'{trace.itemsize} byte(s)/step')
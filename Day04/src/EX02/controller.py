@@ -0,0 +1,191 @@
+from typing import Callable, Dict, Iterator, List
+from itertools import compress
+import argparse
+import asyncio
+import operator
+
+from pressure import emit_gel, LOW, HIGH, EMERGENCY_LOW, EMERGENCY_HIGH
+
+
+class ValveController:
+    """Many emit_gel() generators controlled together.
+
+    Every tick takes the decisions of all the running valves at once, a
+    valve is a position in parallel lists rather than its own task, so
+    thousands of valves cost one pass of map() per tick. A valve whose
+    pressure leaves [emergency_low, emergency_high] is closed, its metrics
+    are kept in `stopped`.
+    """
+    def __init__(self,
+                 step_sizes: List[int],
+                 generator: Callable[[int], Iterator[int]] = emit_gel,
+                 low: int = LOW,
+                 high: int = HIGH,
+                 emergency_low: int = EMERGENCY_LOW,
+                 emergency_high: int = EMERGENCY_HIGH) -> None:
+        self.low: int = low
+        self.high: int = high
+        self.emergency_low: int = emergency_low
+        self.emergency_high: int = emergency_high
+        self.generators: List[Iterator[int]] = [generator(step_size) for step_size in step_sizes]
+        self.ids: List[int] = list(range(len(step_sizes)))
+        self.sends: List[Callable[[int], int]] = [gel.send for gel in self.generators]
+        self.steps: List[int] = list(step_sizes)
+        self.pressures: List[int] = [next(gel) for gel in self.generators]
+        self.minimum: List[int] = list(self.pressures)
+        self.maximum: List[int] = list(self.pressures)
+        self.totals: List[int] = list(self.pressures)
+        self.flips: List[int] = [0] * len(step_sizes)
+        self.ticks: int = 0
+        self.stopped: Dict[int, Dict] = {}
+        self.running: bool = False
+        self._stop_emergencies()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def tick(self) -> None:
+        """One control decision and one measurement for every running valve"""
+        low, high = self.low, self.high
+        steps: List[int] = [
+            abs(step) if pressure < low else -abs(step) if pressure > high else step
+            for pressure, step in zip(self.pressures, self.steps)
+        ]
+        self.flips = list(map(operator.add, self.flips, map(operator.ne, self.steps, steps)))
+        self.steps = steps
+        self.pressures = [send(step) for send, step in zip(self.sends, steps)]
+        self.minimum = list(map(min, self.minimum, self.pressures))
+        self.maximum = list(map(max, self.maximum, self.pressures))
+        self.totals = list(map(operator.add, self.totals, self.pressures))
+        self.ticks += 1
+        self._stop_emergencies()
+
+    def _stop_emergencies(self) -> None:
+        emergency_low, emergency_high = self.emergency_low, self.emergency_high
+        safe: List[bool] = [emergency_low <= pressure <= emergency_high for pressure in self.pressures]
+        if all(safe):
+            return
+        for position in compress(range(len(safe)), map(operator.not_, safe)):
+            self.generators[position].close()
+            self.stopped[self.ids[position]] = self._metrics(position)
+        for name in ('ids', 'generators', 'sends', 'steps', 'pressures', 'minimum', 'maximum', 'totals', 'flips'):
+            setattr(self, name, list(compress(getattr(self, name), safe)))
+
+    def _metrics(self, position: int) -> Dict:
+        return {
+            'valve': self.ids[position],
+            'pressure': self.pressures[position],
+            'step': self.steps[position],
+            'min': self.minimum[position],
+            'max': self.maximum[position],
+            'mean': self.totals[position] / (self.ticks + 1),
+            'flips': self.flips[position],
+            'ticks': self.ticks,
+            'running': emergency_free(self.pressures[position], self.emergency_low, self.emergency_high),
+        }
+
+    def metrics(self, valve: int) -> Dict:
+        if valve in self.stopped:
+            return self.stopped[valve]
+        try:
+            return self._metrics(self.ids.index(valve))
+        except ValueError:
+            raise KeyError(f'Unknown valve {valve}') from None
+
+    def snapshot(self) -> List[Dict]:
+        """Metrics of every valve, running and stopped, ordered by valve"""
+        running: List[Dict] = [self._metrics(position) for position in range(len(self.ids))]
+        return sorted(running + list(self.stopped.values()), key=operator.itemgetter('valve'))
+
+    def summary(self) -> Dict:
+        return {
+            'ticks': self.ticks,
+            'running': len(self.ids),
+            'stopped': len(self.stopped),
+            'mean_pressure': sum(self.pressures) / len(self.pressures) if self.pressures else None,
+            'min_pressure': min(self.pressures, default=None),
+            'max_pressure': max(self.pressures, default=None),
+        }
+
+    async def run(self, interval: float = 0.5, ticks: int | None = None) -> Dict:
+        """Tick every interval seconds until every valve is stopped, `ticks`
+        ticks have passed or stop() is called"""
+        self.running = True
+        done: int = 0
+        while self.running and self.ids and (ticks is None or done < ticks):
+            self.tick()
+            done += 1
+            await asyncio.sleep(interval)
+        self.running = False
+        return self.summary()
+
+    def stop(self) -> None:
+        self.running = False
+
+
+def emergency_free(pressure: int, emergency_low: int = EMERGENCY_LOW, emergency_high: int = EMERGENCY_HIGH) -> bool:
+    return emergency_low <= pressure <= emergency_high
+
+
+async def monitor(controller: ValveController, task: asyncio.Task, interval: float = 1.0) -> Dict:
+    """Print the summary every interval seconds while the controller runs"""
+    while not task.done():
+        print(controller.summary())
+        await asyncio.wait({task}, timeout=interval)
+    return task.result()
+
+
+def tests() -> None:
+    controller = ValveController([10] * 100 + [50] * 100)
+    asyncio.run(controller.run(interval=0, ticks=1000))
+    assert controller.ticks <= 1000 and len(controller) + len(controller.stopped) == 200
+    snapshot = controller.snapshot()
+    assert [valve['valve'] for valve in snapshot] == list(range(200))
+    # with a step of 10 the pressure can't jump over the emergency limits
+    assert all(valve['running'] for valve in snapshot[:100])
+    assert all(10 <= valve['min'] <= valve['mean'] <= valve['max'] <= 90 for valve in snapshot[:100])
+    assert all(not valve['running'] for valve in snapshot[100:])
+    assert controller.metrics(150) == snapshot[150]
+    assert controller.metrics(0)['flips'] > 0
+
+    # the batched decisions are the decisions of valve()
+    sends: List[int] = []
+
+    def recording_gel(step: int) -> Iterator[int]:
+        for pressure in (50, 85, 70, 15, 30, 95):
+            step = yield pressure
+            sends.append(step)
+
+    single = ValveController([5], recording_gel)
+    asyncio.run(single.run(interval=0))
+    assert sends == [5, -5, -5, 5, 5]
+    assert single.metrics(0) == {
+        'valve': 0, 'pressure': 95, 'step': 5, 'min': 15, 'max': 95,
+        'mean': (50 + 85 + 70 + 15 + 30 + 95) / 6, 'flips': 2, 'ticks': 5, 'running': False,
+    }
+    print('Tests passed!!!')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--valves', type=int, default=1000)
+    parser.add_argument('--step', type=int, nargs='+', default=[10], help='Step sizes, cycled over the valves')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between two ticks')
+    parser.add_argument('--ticks', type=int, default=None)
+    parser.add_argument('--tests', action='store_true')
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    step_sizes: List[int] = [args.step[number % len(args.step)] for number in range(args.valves)]
+    controller = ValveController(step_sizes)
+    task: asyncio.Task = asyncio.create_task(controller.run(args.interval, args.ticks))
+    print(await monitor(controller, task))
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.tests:
+        tests()
+    else:
+        asyncio.run(main(args))
@@ -1,8 +1,23 @@
-from typing import Iterator, Callable
+from typing import Iterator, Callable, List
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, chain
+from mmap import mmap, ACCESS_READ
+import operator
 import random
 import time
 
 
+START_PRESSURE: int = 50
+MAX_PRESSURE: int = 100
+LOW: int = 20
+HIGH: int = 80
+EMERGENCY_LOW: int = 10
+EMERGENCY_HIGH: int = 90
+BATCH_SIZE: int = 1 << 16
+MAX_STEPS: int = 10_000_000
+
+
 def emit_gel(step: int) -> Iterator[int]:
     pressure: int = 50
     while True:
@@ -15,18 +30,22 @@ def emit_gel(step: int) -> Iterator[int]:
 def valve(generator: Callable[[int], Iterator[int]],
           step_size: int,
           show_result: bool,
-          time_sleep: bool) -> None:
-    pressures: Iterator[int] = emit_gel(step_size)
+          time_sleep: bool,
+          low: int = LOW,
+          high: int = HIGH,
+          emergency_low: int = EMERGENCY_LOW,
+          emergency_high: int = EMERGENCY_HIGH) -> None:
+    pressures: Iterator[int] = generator(step_size)
     pressure: int = next(pressures)
-    while 10 <= pressure <= 90:
+    while emergency_low <= pressure <= emergency_high:
         if show_result:
             print(f'Current pressure: {pressure}')
             print(f'Current step: {step_size}')
         if time_sleep:
             time.sleep(0.5)
-        if pressure < 20:
+        if pressure < low:
             step_size = abs(step_size)
-        elif pressure > 80:
+        elif pressure > high:
             step_size = -abs(step_size)
         pressure = pressures.send(step_size)
     else:
@@ -35,11 +54,137 @@ def valve(generator: Callable[[int], Iterator[int]],
         print(f'Current step: {step_size}')
 
 
+def trace_typecode(step_size: int, emergency_low: int = EMERGENCY_LOW) -> str:
+    """A byte per step while the pressures fit into a signed char"""
+    return 'b' if emergency_low - abs(step_size) >= -128 else 'i'
+
+
+def draw_magnitudes(rand: random.Random, step_size: int, batch_size: int = BATCH_SIZE) -> Iterator:
+    """Endless batches of uniform magnitudes from 0 to |step_size|.
+
+    Random bytes are reduced modulo the number of magnitudes by one
+    translate(), the bytes of the incomplete last period are deleted
+    so every magnitude stays equally likely.
+    """
+    count: int = abs(step_size) + 1
+    if count > 256:
+        magnitudes: range = range(count)
+        while True:
+            yield rand.choices(magnitudes, k=batch_size)
+    limit: int = 256 - 256 % count
+    table: bytes = bytes(byte % count for byte in range(256))
+    rejected: bytes = bytes(range(limit, 256))
+    while True:
+        batch: bytes = rand.randbytes(batch_size).translate(table, rejected)
+        if batch:
+            yield batch
+
+
+def simulate(step_size: int,
+             seed: int | None = None,
+             max_steps: int = MAX_STEPS,
+             low: int = LOW,
+             high: int = HIGH,
+             emergency_low: int = EMERGENCY_LOW,
+             emergency_high: int = EMERGENCY_HIGH,
+             batch_size: int = BATCH_SIZE) -> array:
+    """valve() without printing and sleeping, returns every emitted pressure.
+
+    The pressure goes in one direction until it leaves [low, high], so the
+    steps between two flips are one accumulate() over the drawn magnitudes,
+    the flip is found by bisect. A step is the magnitude randint(0, |step|)
+    with the sign of the current direction, as randint(min(0, step),
+    max(0, step)) in emit_gel(). The simulation stops after the emergency
+    pressure or max_steps steps, the last pressure of an emergency is above
+    emergency_high or below emergency_low.
+    """
+    batches: Iterator = draw_magnitudes(random.Random(seed), step_size, batch_size)
+    # expected number of steps between two flips, four times over
+    chunk: int = max(16, min(batch_size, 8 * (high - low) // max(1, abs(step_size))))
+    trace: array = array(trace_typecode(step_size, emergency_low))
+    drawn: bytes | List[int] = next(batches)
+    position: int = 1
+    direction: int = 1 if step_size >= 0 else -1
+    pressure: int = min(MAX_PRESSURE, START_PRESSURE + direction * drawn[0])
+    trace.append(pressure)
+    while emergency_low <= pressure <= emergency_high and len(trace) < max_steps:
+        if pressure < low:
+            direction = 1
+        elif pressure > high:
+            direction = -1
+        if position == len(drawn):
+            drawn = next(batches)
+            position = 0
+        size: int = min(chunk, len(drawn) - position, max_steps - len(trace))
+        steps: bytes | List[int] = drawn[position:position + size]
+        if direction > 0:
+            pressures: List[int] = list(accumulate(steps, initial=pressure))
+            turn: int = bisect_right(pressures, high, 1)
+        else:
+            # decreasing pressures are increasing after negation
+            pressures = list(accumulate(steps, operator.sub, initial=pressure))
+            turn = bisect_right(pressures, -low, 1, key=operator.neg)
+        end: int = min(turn + 1, len(pressures))
+        position += end - 1
+        pressure = pressures[end - 1]
+        if pressure > MAX_PRESSURE:
+            pressure = pressures[end - 1] = MAX_PRESSURE
+        trace.extend(pressures[1:end])
+    return trace
+
+
+def reference_simulate(step_size: int,
+                       seed: int | None = None,
+                       max_steps: int = MAX_STEPS) -> array:
+    """simulate() one step at a time, the same draws as the batches"""
+    magnitudes: Iterator[int] = chain.from_iterable(draw_magnitudes(random.Random(seed), step_size))
+    direction: int = 1 if step_size >= 0 else -1
+    trace: array = array(trace_typecode(step_size))
+    pressure: int = min(MAX_PRESSURE, START_PRESSURE + direction * next(magnitudes))
+    trace.append(pressure)
+    while EMERGENCY_LOW <= pressure <= EMERGENCY_HIGH and len(trace) < max_steps:
+        if pressure < LOW:
+            direction = 1
+        elif pressure > HIGH:
+            direction = -1
+        pressure = min(MAX_PRESSURE, pressure + direction * next(magnitudes))
+        trace.append(pressure)
+    return trace
+
+
+def is_emergency(trace: array,
+                 emergency_low: int = EMERGENCY_LOW,
+                 emergency_high: int = EMERGENCY_HIGH) -> bool:
+    return not emergency_low <= trace[-1] <= emergency_high
+
+
+def save_trace(trace: array, path: str) -> None:
+    with open(path, 'wb') as file:
+        trace.tofile(file)
+
+
+def load_trace(path: str, typecode: str = 'b') -> memoryview:
+    """Memory-mapped trace, nothing is read before it is indexed"""
+    with open(path, 'rb') as file:
+        return memoryview(mmap(file.fileno(), 0, access=ACCESS_READ)).cast(typecode)
+
+
 def tests() -> None:
     print('\nTEST1\n')
     valve(emit_gel, 50, True, True)
     print('\nTEST2\n')
     valve(emit_gel, 22, True, False)
+    print('\nTEST3\n')
+    for step_size in (1, 5, 10, 11, 22, -22, 50, 200):
+        for seed in range(20):
+            assert simulate(step_size, seed, 20_000, batch_size=64) == \
+                reference_simulate(step_size, seed, 20_000), (step_size, seed)
+    trace = simulate(22, seed=21)
+    assert is_emergency(trace) and all(10 <= pressure <= 90 for pressure in trace[:-1])
+    assert not is_emergency(simulate(10, seed=21, max_steps=1000))
+    assert len(simulate(0, seed=21, max_steps=1000)) == 1000
+    print(f'Emergency after {len(trace)} steps: {trace[-1]}')
+    print('Tests passed!!!')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,175 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product, repeat
+from typing import Dict, Iterator, List, Tuple
+import argparse
+import csv
+import io
+import sys
+
+from pressure import simulate, is_emergency, LOW, HIGH, EMERGENCY_LOW, EMERGENCY_HIGH, MAX_STEPS
+
+
+SHARD_SIZE: int = 100
+Config = Tuple[int, int, int, int, int]
+FIELDS: List[str] = [
+    'step_size', 'low', 'high', 'emergency_low', 'emergency_high', 'runs', 'failures',
+    'failure_rate', 'mean', 'min', 'p10', 'p50', 'p90', 'max',
+]
+
+
+def grid(step_sizes: List[int],
+         lows: List[int],
+         highs: List[int],
+         emergency_lows: List[int],
+         emergency_highs: List[int]) -> Iterator[Config]:
+    """Every combination where emergency_low <= low < high <= emergency_high"""
+    for step_size, low, high, emergency_low, emergency_high in product(
+            step_sizes, lows, highs, emergency_lows, emergency_highs):
+        if emergency_low <= low < high <= emergency_high:
+            yield step_size, low, high, emergency_low, emergency_high
+
+
+def percentile(values: List[int], fraction: float) -> int | None:
+    """Nearest-rank percentile of the sorted values"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_shard(config: Config, runs: range, max_steps: int, seed: int) -> List[int]:
+    """Time to failure in steps of every run which ended by the emergency,
+    a run which lasted max_steps counts only in the failure rate"""
+    step_size, low, high, emergency_low, emergency_high = config
+    failures: List[int] = []
+    for run in runs:
+        trace = simulate(step_size, f'{seed}:{config}:{run}', max_steps,
+                         low, high, emergency_low, emergency_high)
+        if is_emergency(trace, emergency_low, emergency_high):
+            failures.append(len(trace))
+    return failures
+
+
+def summarize(config: Config, runs: int, failures: List[int]) -> Dict:
+    failures.sort()
+    step_size, low, high, emergency_low, emergency_high = config
+    return {
+        'step_size': step_size,
+        'low': low,
+        'high': high,
+        'emergency_low': emergency_low,
+        'emergency_high': emergency_high,
+        'runs': runs,
+        'failures': len(failures),
+        'failure_rate': len(failures) / runs,
+        'mean': sum(failures) / len(failures) if failures else None,
+        'min': percentile(failures, 0),
+        'p10': percentile(failures, 0.1),
+        'p50': percentile(failures, 0.5),
+        'p90': percentile(failures, 0.9),
+        'max': percentile(failures, 1),
+    }
+
+
+def sweep(configs: List[Config],
+          runs: int = 1000,
+          max_steps: int = 10_000,
+          seed: int = 21,
+          workers: int | None = None,
+          shard_size: int = SHARD_SIZE) -> Iterator[Dict]:
+    """The runs of every config are split into shards of shard_size, so
+    a small grid still keeps all the workers busy. A row is yielded as soon
+    as all the shards of its config and of the configs before it are ready."""
+    if runs < 1:
+        raise ValueError(f'runs must be at least 1, got {runs}')
+    shards: List[Tuple[Config, range]] = [
+        (config, range(start, min(start + shard_size, runs)))
+        for config in configs
+        for start in range(0, runs, shard_size)
+    ]
+    arguments = ([config for config, _ in shards], [part for _, part in shards], repeat(max_steps), repeat(seed))
+    shards_per_config: int = -(-runs // shard_size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results: Iterator[List[int]] = executor.map(run_shard, *arguments)
+        for config in configs:
+            failures: List[int] = []
+            for _ in range(shards_per_config):
+                failures += next(results)
+            yield summarize(config, runs, failures)
+
+
+def write_csv(results: Iterator[Dict], file) -> int:
+    writer = csv.DictWriter(file, FIELDS)
+    writer.writeheader()
+    written: int = 0
+    for row in results:
+        writer.writerow(row)
+        file.flush()
+        written += 1
+    return written
+
+
+def positive(value: str) -> int:
+    number: int = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {number}')
+    return number
+
+
+def tests() -> None:
+    configs: List[Config] = list(grid([10, 22], [20, 30], [80], [10], [90]))
+    assert configs == [(10, 20, 80, 10, 90), (10, 30, 80, 10, 90), (22, 20, 80, 10, 90), (22, 30, 80, 10, 90)]
+    assert list(grid([10], [20], [20], [10], [90])) == []
+    single: List[Dict] = list(sweep(configs, runs=30, max_steps=2000, workers=1, shard_size=7))
+    parallel: List[Dict] = list(sweep(configs, runs=30, max_steps=2000, workers=2, shard_size=100))
+    assert single == parallel
+    assert [row['step_size'] for row in single] == [10, 10, 22, 22]
+    # a step of 10 can't jump over the emergency limits, 22 always does
+    assert single[0]['failures'] == 0 and single[0]['mean'] is None
+    assert single[2]['failures'] == 30 and single[2]['failure_rate'] == 1.0
+    assert single[2]['min'] <= single[2]['p10'] <= single[2]['p50'] <= single[2]['p90'] <= single[2]['max']
+
+    output = io.StringIO()
+    assert write_csv(iter(single), output) == 4
+    rows: List[Dict] = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert list(rows[0]) == FIELDS and len(rows) == 4
+    assert rows[0]['failures'] == '0' and rows[0]['mean'] == ''
+    assert rows[2]['p50'] == str(single[2]['p50'])
+    try:
+        next(sweep(configs, runs=0))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('runs=0 is accepted')
+    print('Tests passed!!!')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--steps', type=int, nargs='+', default=[5, 10, 15, 22, 30])
+    parser.add_argument('--lows', type=int, nargs='+', default=[LOW])
+    parser.add_argument('--highs', type=int, nargs='+', default=[HIGH])
+    parser.add_argument('--emergency-lows', type=int, nargs='+', default=[EMERGENCY_LOW])
+    parser.add_argument('--emergency-highs', type=int, nargs='+', default=[EMERGENCY_HIGH])
+    parser.add_argument('--runs', type=positive, default=1000, help='Seeded simulations of every config')
+    parser.add_argument('--max-steps', type=int, default=10_000,
+                        help=f'Steps after which a run counts as safe, at most {MAX_STEPS}')
+    parser.add_argument('--seed', type=int, default=21)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('-o', '--output', default='-', help='CSV file, - for stdout')
+    parser.add_argument('--tests', action='store_true')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.tests:
+        tests()
+    else:
+        configs: List[Config] = list(grid(args.steps, args.lows, args.highs,
+                                          args.emergency_lows, args.emergency_highs))
+        results: Iterator[Dict] = sweep(configs, args.runs, min(args.max_steps, MAX_STEPS), args.seed, args.workers)
+        if args.output == '-':
+            write_csv(results, sys.stdout)
+        else:
+            with open(args.output, 'w', newline='') as file:
+                write_csv(results, file)